@@ -4,33 +4,219 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 import time
+import base64
 from io import BytesIO
 from PIL import Image
 import re
+import colorsys
 import cssutils
 import logging
-from colorthief import ColorThief
+import numpy as np
 from collections import Counter
+from string import Template
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import jsonschema
 import json
+import hashlib
 import datetime
 import argparse
+import multiprocessing
+import multiprocessing.util
 import os
 import sys
 import traceback
-import yaml  # Added for YAML output option
+try:
+    import orjson  # Optional: much faster JSON encoding for the saved schema files
+except ImportError:
+    orjson = None
+from urllib.parse import urljoin, urlparse
+from dataclasses import dataclass, field
+from pathlib import Path
+import html
+
+# Progress messages from the extraction pipeline (shown with -v/--verbose on the CLI)
+logger = logging.getLogger(__name__)
 
 # Disable cssutils log messages
 cssutils.log.setLevel(logging.CRITICAL)
 
-def fetch_webpage(url):
+# In-page visibility test shared by the batched getComputedStyle scripts below:
+# an element is visible if it has a layout box and is not hidden by visibility/display.
+_IS_VISIBLE_JS = """
+function isVisible(el) {
+    if (!el.getClientRects().length) return false;
+    const style = window.getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none';
+}
+"""
+
+# Maximum number of element handles returned by find_visible_elements
+_MAX_VISIBLE_ELEMENTS = 20
+
+# Patterns used on every page, compiled once at import time
+# Single-pass scan of the page HTML for <style> blocks, <link> and <base> tags and class attributes
+_PAGE_SCAN_RE = re.compile(
+    r'<style[^>]*>(?P<style>.*?)</style>|<link\b(?P<link>[^>]*)>|<base\b(?P<base>[^>]*)>'
+    r'|class=["\'](?P<classes>[^"\']+)["\']',
+    re.DOTALL | re.IGNORECASE
+)
+_HREF_ATTR_RE = re.compile(r'\bhref\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+# class attribute inside a tag consumed whole by _PAGE_SCAN_RE (<link>, <base>)
+_CLASS_ATTR_RE = re.compile(r'class=["\']([^"\']+)["\']', re.IGNORECASE)
+_FONT_IMPORT_RE = re.compile(r'@import\s+url\(([^)]+?fonts[^)]+)\);', re.IGNORECASE)
+_RGB_NUMBERS_RE = re.compile(r'\d+')
+_CSS_NUMBER_RE = re.compile(r'\d*\.?\d+')
+_HEX_COLOR_RE = re.compile(r'^#[0-9a-fA-F]{6}$')
+_BORDER_COLOR_RE = re.compile(r'(rgba?\([^)]+\))')
+_LEADING_NUMBER_RE = re.compile(r'^[+-]?(\d*\.)?\d+')
+_BG_URL_RE = re.compile(r'url\("?([^")]+)"?\)')
+_WP_THEME_RE = re.compile(r'wp-content/themes/([^/]+)', re.IGNORECASE)
+_SLUG_SEPARATOR_RE = re.compile(r'[^A-Za-z0-9]+')
+_SERIF_RE = re.compile(r'serif|georgia|times|palatino|bookman|charter', re.IGNORECASE) # Serif font indicators
+
+# Common indicators (matched anywhere in the class name) of utility classes or frameworks
+_UTILITY_CLASS_RE = re.compile('|'.join(re.escape(indicator) for indicator in (
+    'text-', 'bg-', 'p-', 'm-', 'flex', 'grid', 'border', 'rounded', 'w-', 'h-', 'font-', 'shadow',
+    'item', 'container', 'row', 'col-', 'nav-', 'btn-', 'card-', 'form-'
+)))
+
+# Declarations of color-related CSS properties (color, background*, border*, fill, stroke, ...),
+# anchored after '{' or ';' so selectors such as '.btn-border:hover #facade' are not read as values,
+# and the color tokens (#hex, rgb[a](), hsl[a]()) found in their values
+_CSS_COLOR_DECLARATION_RE = re.compile(r'(?:^|[{;])\s*[\w-]*(?:color|background|border|fill|stroke)[\w-]*\s*:\s*([^;{}]+)', re.IGNORECASE)
+_CSS_COLOR_TOKEN_RE = re.compile(r'#[0-9a-fA-F]{3,8}\b|rgba?\([^)]*\)|hsla?\([^)]*\)', re.IGNORECASE)
+# Color-related property names and non-color values for the cssutils fallback
+_COLOR_PROPS_RE = re.compile(r'color|background|border|fill|stroke', re.IGNORECASE)
+_INVALID_CSS_VALUES = frozenset({'inherit', 'transparent', 'none', 'initial', 'unset'})
+
+# URL patterns blocked by create_driver(block_assets=True): images, fonts and media
+_BLOCKED_ASSET_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3', '*.ogg',
+]
+
+# ChromeDriver binary path, resolved once per process by _chromedriver_path()
+_DRIVER_PATH = None
+
+def _chromedriver_path():
+    """Resolve (and install if needed) the ChromeDriver binary once and cache its path."""
+    global _DRIVER_PATH
+    if _DRIVER_PATH is None:
+        _DRIVER_PATH = ChromeDriverManager().install()
+    return _DRIVER_PATH
+
+def create_driver(block_assets=False):
+    """
+    Create a headless Chrome WebDriver configured for design extraction.
+    The driver can be reused across pages by passing it to fetch_webpage or
+    extract_design_scheme_extended, which amortizes the Chrome startup cost.
+
+    Args:
+        block_assets (bool): Block image, font and media requests through the DevTools
+                             protocol. Pages load much faster, but the screenshot palette
+                             and image/logo analysis only see CSS-rendered content and
+                             web fonts fall back to system fonts. Defaults to False.
+
+    Returns:
+        webdriver.Chrome: A new WebDriver instance. The caller is responsible for quitting it.
+    """
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument('--log-level=3') # Suppress console logs from Chrome/ChromeDriver
+
+    service = Service(_chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=options)
+    if block_assets:
+        # The block list applies to every page loaded by this driver
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_ASSET_PATTERNS})
+    return driver
+
+def wait_for_page_ready(driver, max_wait=15, idle_time=0.5, complete_wait=5):
+    """
+    Wait until the page has finished loading and its network activity has settled.
+    Replaces a fixed sleep: fast pages return almost immediately, slow ones get up to max_wait.
+
+    The page counts as settled once document.readyState is "complete" and no new
+    resources (Performance API entries) have finished loading for idle_time seconds.
+    Pages that keep loading resources after that (polling, analytics beacons, carousels)
+    count as settled once readyState has been "complete" for complete_wait seconds, the
+    budget of the fixed sleep this replaced.
+
+    Args:
+        driver: Selenium webdriver instance
+        max_wait (float): Maximum number of seconds to wait
+        idle_time (float): Seconds without new resource entries required to consider the network idle
+        complete_wait (float): Seconds after readyState "complete" to stop waiting for the network
+
+    Returns:
+        bool: True if the page settled, False if max_wait was reached first
+    """
+    last_seen = {"count": None, "since": 0.0, "complete_since": None}
+
+    def page_settled(d):
+        ready_state, resource_count = d.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length];"
+        )
+        now = time.monotonic()
+        if ready_state != "complete":
+            last_seen["count"], last_seen["since"], last_seen["complete_since"] = resource_count, now, None
+            return False
+        if last_seen["complete_since"] is None:
+            last_seen["complete_since"] = now
+        elif now - last_seen["complete_since"] >= complete_wait:
+            return True # Loaded, but the network never goes quiet
+        if resource_count != last_seen["count"]:
+            last_seen["count"], last_seen["since"] = resource_count, now
+            return False
+        return now - last_seen["since"] >= idle_time
+
+    try:
+        # Script errors while the page navigates or redirects are retried on the next poll
+        WebDriverWait(driver, max_wait, poll_frequency=0.1, ignored_exceptions=(WebDriverException,)).until(page_settled)
+        return True
+    except TimeoutException:
+        logger.info("Page did not settle within %ss, continuing with its current state", max_wait)
+        return False
+
+def capture_screenshot(driver):
+    """
+    Capture a PNG screenshot of the viewport.
+
+    Uses the DevTools protocol directly (Page.captureScreenshot with optimizeForSpeed),
+    which skips Chrome's size-optimized PNG encoding used by the WebDriver screenshot
+    endpoint. Falls back to the WebDriver endpoint if the command is unavailable.
+
+    Args:
+        driver: Selenium Chrome webdriver instance
+
+    Returns:
+        bytes: PNG image data
+    """
+    try:
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", {"format": "png", "optimizeForSpeed": True})
+        return base64.b64decode(result["data"])
+    except Exception:
+        return driver.get_screenshot_as_png()
+
+def fetch_webpage(url, driver=None, max_wait=15, block_assets=False):
     """
     Fetch a webpage using both requests (for static content) and Selenium (for dynamic content).
     This ensures we capture styles that might be applied via JavaScript.
 
     Args:
         url (str): The URL of the webpage to analyze
+        driver: Existing Selenium webdriver instance to load the page in (optional).
+                If omitted, a new driver is created and owned by the caller of this function.
+        max_wait (float): Maximum number of seconds to wait for the page to finish loading
+        block_assets (bool): Block images, fonts and media when creating a new driver
+                             (see create_driver). Ignored when a driver is provided.
 
     Returns:
         tuple: (html_content, screenshot, driver)
@@ -44,22 +230,24 @@ def fetch_webpage(url):
         print(f"Simple request failed: {e}, falling back to Selenium")
         static_html = None
 
-    # Set up Selenium for full rendering
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument('--log-level=3') # Suppress console logs from Chrome/ChromeDriver
-
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # Set up Selenium for full rendering, unless a driver was provided
+    owns_driver = driver is None
+    if owns_driver:
+        driver = create_driver(block_assets)
+    else:
+        # Reused driver: drop state left over from the previously loaded page
+        try:
+            driver.delete_all_cookies()
+        except Exception:
+            pass # No page loaded yet, nothing to clear
 
     try:
         driver.get(url)
-        # Wait for page to fully load
-        time.sleep(5)  # Simple wait, might need adjustment for complex pages
+        # Wait for page to fully load (readyState complete and network idle)
+        wait_for_page_ready(driver, max_wait)
 
         # Take screenshot for visual analysis
-        screenshot = driver.get_screenshot_as_png()
+        screenshot = capture_screenshot(driver)
 
         # Get the fully rendered HTML
         rendered_html = driver.page_source
@@ -68,21 +256,83 @@ def fetch_webpage(url):
         html_content_to_use = rendered_html if rendered_html else static_html
 
         if not html_content_to_use:
-             driver.quit()
              raise Exception("Failed to retrieve HTML content using both requests and Selenium.")
 
         return (html_content_to_use, screenshot, driver)
     except Exception as e:
-        driver.quit()
+        # Only shut down drivers created here; a provided driver is reused by the caller
+        if owns_driver:
+            driver.quit()
         raise Exception(f"Failed to load page with Selenium: {e}")
 
+@dataclass
+class PageContext:
+    """
+    HTML-derived data shared by all extractors for a single page.
+
+    Built once per page by PageContext.from_html, so the raw HTML is scanned a
+    single time instead of separately by every extractor.
+    """
+    url: str # Final document URL (after redirects)
+    html_content: str
+    style_blocks: list = field(default_factory=list) # Contents of each <style> tag
+    style_text: str = "" # All <style> contents joined together
+    link_hrefs: list = field(default_factory=list) # href of every <link> tag, entity-decoded
+    class_counts: Counter = field(default_factory=Counter) # Occurrences of each CSS class name
+    base_url: str = "" # Document base URL (<base href> resolved against url), used to resolve relative links
+
+    @classmethod
+    def from_html(cls, url, html_content):
+        """Scan the page HTML once and collect everything the extractors need."""
+        style_blocks, link_hrefs, class_counts = [], [], Counter()
+        base_href = None
+        for match in _PAGE_SCAN_RE.finditer(html_content):
+            if match.group('style') is not None:
+                style_blocks.append(match.group('style'))
+            elif match.group('classes') is not None:
+                class_counts.update(match.group('classes').split())
+            else:
+                tag_attrs = match.group('link')
+                if tag_attrs is None:
+                    tag_attrs = match.group('base')
+                    href_match = _HREF_ATTR_RE.search(tag_attrs)
+                    if href_match and base_href is None: # Only the first <base href> counts
+                        base_href = html.unescape(href_match.group(1))
+                else:
+                    href_match = _HREF_ATTR_RE.search(tag_attrs)
+                    if href_match:
+                        link_hrefs.append(html.unescape(href_match.group(1)))
+                class_match = _CLASS_ATTR_RE.search(tag_attrs)
+                if class_match:
+                    class_counts.update(class_match.group(1).split())
+        base_url = urljoin(url, base_href) if base_href else url
+        return cls(url, html_content, style_blocks, "\n".join(style_blocks), link_hrefs, class_counts, base_url)
+
 def rgb_to_hex(rgb_str):
     """Converts RGB or RGBA string to hex."""
-    if not rgb_str or 'rgb' not in rgb_str.lower():
+    if not rgb_str:
+        return None
+    # Surrounding whitespace is stripped so equivalent strings share a cache entry
+    return _rgb_str_to_hex(rgb_str.strip())
+
+@lru_cache(maxsize=4096)
+def _rgb_str_to_hex(rgb_str):
+    """Cached conversion behind rgb_to_hex; computed styles repeat the same few colors across elements."""
+    # Fast path for the "rgb(R, G, B)" / "rgba(R, G, B, A)" format returned by getComputedStyle
+    if rgb_str.startswith(('rgb(', 'rgba(')):
+        parts = rgb_str[rgb_str.find('(') + 1:rgb_str.find(')')].split(',', 3)
+        if len(parts) >= 3:
+            try:
+                r, g, b = int(parts[0]), int(parts[1]), int(parts[2])
+                r, g, b = max(0, min(r, 255)), max(0, min(g, 255)), max(0, min(b, 255))
+                return f'#{r:02x}{g:02x}{b:02x}'
+            except ValueError:
+                pass # Not plain integers (e.g. fractional values), use the general parser below
+    if 'rgb' not in rgb_str.lower():
         return None
     try:
         # Extract numeric values using regex, handles rgb(R, G, B) and rgba(R, G, B, A)
-        numbers = re.findall(r'\d+', rgb_str)
+        numbers = _RGB_NUMBERS_RE.findall(rgb_str)
         if len(numbers) >= 3:
             r, g, b = map(int, numbers[:3])
             # Ensure values are within 0-255 range
@@ -94,110 +344,177 @@ def rgb_to_hex(rgb_str):
         print(f"Error converting RGB string '{rgb_str}' to hex: {e}")
     return None
 
-def extract_color_palette(screenshot, driver, html_content):
+def css_color_to_hex(color_token):
+    """Converts a CSS color token (#hex, rgb()/rgba() or hsl()/hsla()) to a 6-digit hex string."""
+    token = color_token.strip().lower()
+    if token.startswith('#'):
+        digits = token[1:]
+        if len(digits) in (3, 4): # Short form (#rgb / #rgba), alpha is dropped
+            return '#' + ''.join(c * 2 for c in digits[:3])
+        if len(digits) in (6, 8): # Long form (#rrggbb / #rrggbbaa), alpha is dropped
+            return '#' + digits[:6]
+        return None
+    if token.startswith('hsl'):
+        numbers = _CSS_NUMBER_RE.findall(token)
+        if len(numbers) < 3:
+            return None
+        hue = float(numbers[0]) / 360 % 1
+        saturation = max(0.0, min(float(numbers[1]) / 100, 1.0))
+        lightness = max(0.0, min(float(numbers[2]) / 100, 1.0))
+        r, g, b = (round(c * 255) for c in colorsys.hls_to_rgb(hue, lightness, saturation))
+        return f'#{r:02x}{g:02x}{b:02x}'
+    return rgb_to_hex(token)
+
+# Number of histogram buckets for 5-bit-per-channel quantized colors
+_COLOR_BUCKETS = 1 << 15
+
+def _dominant_colors(img, color_count=10):
     """
-    Extract the dominant color palette from the webpage.
-    Uses multiple methods to ensure comprehensive color extraction.
+    Find the most common colors in a screenshot image.
+
+    The image is downsampled to 200x200 and every pixel is quantized to 5 bits per channel,
+    so the histogram is a single np.bincount over the 32768 possible buckets instead of a
+    sort of 40k pixel keys. The mode conversion happens after downsampling, so only the
+    small image is converted to RGB.
+
+    Args:
+        img: PIL image of the screenshot
+        color_count (int): Maximum number of colors to return
+
+    Returns:
+        list: (r, g, b) tuples ordered by pixel count, each the mean color of its bucket
+    """
+    # reducing_gap lets Pillow shrink the full-size screenshot with a fast integer reduce()
+    # before the bilinear resample
+    small = img.resize((200, 200), Image.BILINEAR, reducing_gap=2.0).convert('RGB')
+    pixels = np.asarray(small).reshape(-1, 3)
+    quantized = (pixels >> 3).astype(np.uint16)
+    keys = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+    counts = np.bincount(keys, minlength=_COLOR_BUCKETS)
+    occupied = np.flatnonzero(counts)
+    top = occupied[np.argsort(-counts[occupied], kind='stable')[:color_count]]
+    # Average the real pixel values in each bucket rather than using the bucket corner
+    channel_sums = np.stack([np.bincount(keys, weights=pixels[:, c], minlength=_COLOR_BUCKETS) for c in range(3)], axis=1)
+    means = np.rint(channel_sums[top] / counts[top, None]).astype(int)
+    return [tuple(int(v) for v in rgb) for rgb in means]
+
+def extract_screenshot_colors(screenshot):
+    """
+    Get the dominant colors of a screenshot as hex strings.
+
+    This is pure pixel work on the screenshot bytes and never touches the driver, so it
+    can run on another thread while the Selenium-bound extractors are running.
 
     Args:
         screenshot: PNG screenshot data from Selenium
-        driver: Selenium webdriver instance
-        html_content: HTML content of the page
 
     Returns:
-        dict: Color palette information
+        list: Hex color strings ordered by pixel count
     """
     # Create image from screenshot
     try:
         img = Image.open(BytesIO(screenshot))
+        img.load()
     except Exception as e:
         print(f"Error opening screenshot image: {e}")
-        img = None
+        return []
 
-    # Method 1: Use ColorThief to get dominant colors from the screenshot
-    dominant_colors_rgb = []
-    if img:
-        try:
-            color_thief = ColorThief(BytesIO(screenshot))
-            # Use a slightly higher quality setting if possible
-            dominant_colors_rgb = color_thief.get_palette(color_count=10, quality=5)
-        except Exception as e:
-            print(f"ColorThief failed: {e}")
+    # Get dominant colors from a quantized histogram of the screenshot
+    try:
+        dominant_colors_rgb = _dominant_colors(img, color_count=10)
+    except Exception as e:
+        print(f"Screenshot color extraction failed: {e}")
+        return []
+
+    return [f'#{r:02x}{g:02x}{b:02x}' for r, g, b in dominant_colors_rgb]
+
+def extract_color_palette(screenshot, driver, page, screenshot_colors=None):
+    """
+    Extract the dominant color palette from the webpage.
+    Uses multiple methods to ensure comprehensive color extraction.
 
-    hex_dominant_colors = [f'#{r:02x}{g:02x}{b:02x}' for r, g, b in dominant_colors_rgb]
+    Args:
+        screenshot: PNG screenshot data from Selenium
+        driver: Selenium webdriver instance
+        page: PageContext for the page
+        screenshot_colors (list, optional): Result of extract_screenshot_colors(screenshot)
+                                            if it was already computed elsewhere
+
+    Returns:
+        dict: Color palette information
+    """
+    # Method 1: Get dominant colors from the screenshot
+    if screenshot_colors is None:
+        screenshot_colors = extract_screenshot_colors(screenshot)
+    hex_dominant_colors = screenshot_colors
 
     # Method 2: Extract colors from CSS in <style> tags
-    colors_from_css_rules = set()
+    # A regex scan of the color declarations is used instead of a full CSS parse;
+    # cssutils is only used as a fallback when the scan finds nothing.
+    hex_css_rule_colors = set()
     try:
-        style_tags = re.findall(r'<style[^>]*>(.*?)</style>', html_content, re.DOTALL | re.IGNORECASE)
-        for style_content in style_tags:
-            try:
-                sheet = cssutils.parseString(style_content, validate=False)
-                for rule in sheet:
-                    if rule.type == rule.STYLE_RULE:
-                        for prop in rule.style:
-                            # Check for color-related properties
-                            if any(color_prop in prop.name.lower() for color_prop in ['color', 'background', 'border', 'fill', 'stroke']):
-                                # Basic check to avoid invalid values like 'inherit', 'transparent', 'none'
-                                if prop.value and prop.value.lower() not in ['inherit', 'transparent', 'none', 'initial', 'unset']:
-                                    colors_from_css_rules.add(prop.value)
-            except Exception as e:
-                # Ignore errors from individual style blocks
-                # print(f"CSS parsing error in style tag: {e}")
-                pass # Continue parsing other tags
+        for declaration_value in _CSS_COLOR_DECLARATION_RE.findall(page.style_text):
+            for color_token in _CSS_COLOR_TOKEN_RE.findall(declaration_value):
+                hex_css_rule_colors.add(css_color_to_hex(color_token))
+
+        if page.style_text and not hex_css_rule_colors:
+            for style_content in page.style_blocks:
+                try:
+                    sheet = cssutils.parseString(style_content, validate=False)
+                    for rule in sheet:
+                        if rule.type == rule.STYLE_RULE:
+                            for prop in rule.style:
+                                # Check for color-related properties
+                                if _COLOR_PROPS_RE.search(prop.name):
+                                    # Basic check to avoid invalid values like 'inherit', 'transparent', 'none'
+                                    if prop.value and prop.value.lower() not in _INVALID_CSS_VALUES:
+                                        hex_css_rule_colors.add(rgb_to_hex(prop.value))
+                except Exception as e:
+                    # Ignore errors from individual style blocks
+                    pass # Continue parsing other tags
     except Exception as e:
         print(f"Error extracting style tags: {e}")
 
     # Method 3: Use Selenium to extract computed styles of visible elements
     computed_colors_raw = set()
     try:
-        # Prioritize common elements like body, headers, buttons, links
-        elements_to_check = driver.find_elements("css selector", "body, h1, h2, h3, p, a, button, .btn, .card")
-        # Limit the number of elements checked for performance
-        elements_to_check = elements_to_check[:150]
-
-        for element in elements_to_check:
-            try:
-                # Check visibility might be too slow, rely on computed style checks
-                # if not element.is_displayed():
-                #     continue
-
-                bg_color = driver.execute_script("return window.getComputedStyle(arguments[0]).backgroundColor", element)
-                color = driver.execute_script("return window.getComputedStyle(arguments[0]).color", element)
-                border_color = driver.execute_script("return window.getComputedStyle(arguments[0]).borderColor", element) # Check border color too
-
-                # Add if it's a valid color string and not transparent
-                if bg_color and 'rgba(0, 0, 0, 0)' not in bg_color and 'transparent' not in bg_color:
-                    computed_colors_raw.add(bg_color)
-                if color and 'rgba(0, 0, 0, 0)' not in color and 'transparent' not in color:
-                    computed_colors_raw.add(color)
-                if border_color and 'rgba(0, 0, 0, 0)' not in border_color and 'transparent' not in border_color and 'none' not in border_color:
-                     # Border color can be complex (e.g., "rgb(0, 0, 0) none none"), extract first color part
-                     border_color_match = re.match(r'(rgba?\([^)]+\))', border_color)
-                     if border_color_match:
-                         computed_colors_raw.add(border_color_match.group(1))
-
-            except Exception:
-                # Ignore errors for individual elements (e.g., stale element reference)
-                continue
+        # Prioritize common elements like body, headers, buttons, links.
+        # Returns [background, color, border color] for up to 150 matching elements.
+        color_triples = driver.execute_script("""
+            return Array.from(document.querySelectorAll(arguments[0])).slice(0, arguments[1]).map(function (el) {
+                const style = window.getComputedStyle(el);
+                return [style.backgroundColor, style.color, style.borderColor];
+            });
+        """, "body, h1, h2, h3, p, a, button, .btn, .card", 150) or []
+
+        for bg_color, color, border_color in color_triples:
+            # Add if it's a valid color string and not transparent
+            if bg_color and 'rgba(0, 0, 0, 0)' not in bg_color and 'transparent' not in bg_color:
+                computed_colors_raw.add(bg_color)
+            if color and 'rgba(0, 0, 0, 0)' not in color and 'transparent' not in color:
+                computed_colors_raw.add(color)
+            if border_color and 'rgba(0, 0, 0, 0)' not in border_color and 'transparent' not in border_color and 'none' not in border_color:
+                 # Border color can be complex (e.g., "rgb(0, 0, 0) none none"), extract first color part
+                 border_color_match = _BORDER_COLOR_RE.match(border_color)
+                 if border_color_match:
+                     computed_colors_raw.add(border_color_match.group(1))
     except Exception as e:
         print(f"Error extracting computed styles: {e}")
 
     # Convert all extracted colors to standardized hex format
     hex_computed_colors = {rgb_to_hex(c) for c in computed_colors_raw}
-    hex_css_rule_colors = {rgb_to_hex(c) for c in colors_from_css_rules} # Also convert CSS rule colors
 
     # Combine and filter valid hex colors
     all_hex_colors = set(hex_dominant_colors) | hex_computed_colors | hex_css_rule_colors
-    valid_hex_colors = {c for c in all_hex_colors if c is not None and re.match(r'^#[0-9a-fA-F]{6}$', c)}
+    valid_hex_colors = {c for c in all_hex_colors if c is not None and _HEX_COLOR_RE.match(c)}
 
-    # Determine primary, secondary, accent colors - simplistic approach based on frequency or order
+    # Determine primary, secondary, accent colors - simplistic approach based on saturation
     # A more sophisticated approach might involve color distance, contrast checks, or area coverage analysis
-    sorted_colors = list(valid_hex_colors)
     # Try getting body background and text color directly as potential base colors
     try:
-        body_bg_color_str = driver.execute_script("return window.getComputedStyle(document.body).backgroundColor")
-        body_text_color_str = driver.execute_script("return window.getComputedStyle(document.body).color")
+        body_bg_color_str, body_text_color_str = driver.execute_script(
+            "const style = window.getComputedStyle(document.body); return [style.backgroundColor, style.color];"
+        )
         background_color_hex = rgb_to_hex(body_bg_color_str) or '#ffffff' # Default white
         text_color_hex = rgb_to_hex(body_text_color_str) or '#000000' # Default black
     except Exception as e:
@@ -206,8 +523,20 @@ def extract_color_palette(screenshot, driver, html_content):
         text_color_hex = '#000000'
 
 
-    # Prioritize non-grayscale colors if possible for primary/secondary/accent
-    non_gray_colors = [c for c in sorted_colors if c.lower() not in [background_color_hex.lower(), text_color_hex.lower()] and not (c[1:3] == c[3:5] == c[5:7])] # Exclude body bg/text and grays
+    # Rank colors by chroma (max - min channel), most colorful first. Channels are unpacked
+    # with vectorized NumPy operations; ties keep hex order so the ranking is deterministic.
+    sorted_colors = sorted(c.lower() for c in valid_hex_colors)
+    non_gray_colors = []
+    if sorted_colors:
+        codes = np.array([int(c[1:], 16) for c in sorted_colors], dtype=np.int32)
+        channels = np.stack([(codes >> 16) & 0xff, (codes >> 8) & 0xff, codes & 0xff])
+        chroma = channels.max(axis=0) - channels.min(axis=0)
+        body_codes = [int(background_color_hex[1:], 16), int(text_color_hex[1:], 16)]
+        # Prioritize non-grayscale colors if possible for primary/secondary/accent
+        candidates = (chroma > 0) & ~np.isin(codes, body_codes) # Exclude body bg/text and grays
+        ranking = np.argsort(-chroma, kind='stable')
+        non_gray_colors = [sorted_colors[i] for i in ranking if candidates[i]]
+        sorted_colors = [sorted_colors[i] for i in ranking]
 
     if len(non_gray_colors) >= 3:
         primary_color = non_gray_colors[0]
@@ -244,13 +573,16 @@ def extract_color_palette(screenshot, driver, html_content):
         "palette": sorted(list(valid_hex_colors))[:15]  # Include full palette (up to 15 colors)
     }
 
-def extract_typography(driver, html_content):
+# Heading levels, in document outline order
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+def extract_typography(driver, page):
     """
     Extract typography information from the webpage.
 
     Args:
         driver: Selenium webdriver instance
-        html_content: HTML content
+        page: PageContext for the page
 
     Returns:
         dict: Typography information
@@ -262,20 +594,14 @@ def extract_typography(driver, html_content):
         "custom_fonts_detected": False # More specific key
     }
 
-    # Helper to safely get computed style
-    def get_style(element, prop):
-        try:
-            return driver.execute_script(f"return window.getComputedStyle(arguments[0]).{prop}", element)
-        except Exception:
-            return None
-
     # Extract body text typography
     try:
         body_element = driver.find_element("css selector", "body")
-        body_font = get_style(body_element, "fontFamily")
-        body_size = get_style(body_element, "fontSize")
-        body_weight = get_style(body_element, "fontWeight")
-        body_line_height = get_style(body_element, "lineHeight")
+        body_styles = get_styles_batch(driver, body_element, ["fontFamily", "fontSize", "fontWeight", "lineHeight"])
+        body_font = body_styles.get("fontFamily")
+        body_size = body_styles.get("fontSize")
+        body_weight = body_styles.get("fontWeight")
+        body_line_height = body_styles.get("lineHeight")
 
         typography["body"] = {
             "font_family": body_font.strip('"\'') if body_font else "sans-serif",
@@ -292,58 +618,51 @@ def extract_typography(driver, html_content):
 
 
     # Extract heading typography (h1-h6)
-    heading_tags = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
-    for tag in heading_tags:
-        try:
-            elements = driver.find_elements("css selector", tag)
-            if elements:
-                # Analyze the first visible heading of this type
-                visible_elements = [el for el in elements if el.is_displayed()]
-                if not visible_elements:
-                    continue # Skip if no visible elements of this type found
-
-                element = visible_elements[0]
-                font_family = get_style(element, "fontFamily")
-                font_size = get_style(element, "fontSize")
-                font_weight = get_style(element, "fontWeight")
-                # Optional: color, text-transform, etc.
-                # color = get_style(element, "color")
-                # text_transform = get_style(element, "textTransform")
-
-                if font_family and font_size and font_weight: # Only add if we got basic info
-                    typography["headings"][tag] = {
-                        "font_family": font_family.strip('"\''),
-                        "font_size": font_size,
-                        "font_weight": font_weight
-                        # "color": rgb_to_hex(color) if color else None,
-                        # "text_transform": text_transform if text_transform else "none"
-                    }
-        except Exception as e:
-            # print(f"Error extracting typography for <{tag}>: {e}")
-            continue # Continue to the next heading tag
+    # Returns the font family, size and weight of the first visible heading of each level
+    try:
+        heading_styles = driver.execute_script(_IS_VISIBLE_JS + """
+            const result = {};
+            for (const tag of arguments[0]) {
+                const el = Array.from(document.getElementsByTagName(tag)).find(isVisible);
+                if (!el) continue; // Skip if no visible elements of this type found
+                const style = window.getComputedStyle(el);
+                result[tag] = [style.fontFamily, style.fontSize, style.fontWeight];
+            }
+            return result;
+        """, list(_HEADING_TAGS)) or {}
+
+        for tag in _HEADING_TAGS:
+            if tag not in heading_styles:
+                continue
+            font_family, font_size, font_weight = heading_styles[tag]
+            # Optional: color, text-transform, etc.
+
+            if font_family and font_size and font_weight: # Only add if we got basic info
+                typography["headings"][tag] = {
+                    "font_family": font_family.strip('"\''),
+                    "font_size": font_size,
+                    "font_weight": font_weight
+                }
+    except Exception as e:
+        print(f"Error extracting heading typography: {e}")
 
     # Look for Google Fonts or other font imports in <link> tags and <style> tags
     font_imports = []
     try:
         # Check <link> tags for fonts.googleapis.com or other font providers
-        link_tags = driver.find_elements("css selector", "link[href*='font'], link[href*='typeface']")
-        for link in link_tags:
-            href = link.get_attribute('href')
-            if href:
-                font_imports.append(href)
+        for href in page.link_hrefs:
+            if 'font' in href or 'typeface' in href:
+                font_imports.append(urljoin(page.base_url, href))
 
         # Check <style> tags for @import url(...) targeting fonts
-        style_imports = re.findall(r'@import\s+url\(([^)]+?fonts[^)]+)\);', html_content, re.IGNORECASE)
+        style_imports = _FONT_IMPORT_RE.findall(page.style_text)
         font_imports.extend(style_imports)
 
         # Check for @font-face rules within <style> tags
-        style_tags_content = re.findall(r'<style[^>]*>(.*?)</style>', html_content, re.DOTALL | re.IGNORECASE)
-        for style_content in style_tags_content:
-            if '@font-face' in style_content:
-                typography["custom_fonts_detected"] = True
-                # Could potentially parse font-family names from @font-face here
-                # font_face_families = re.findall(r'font-family:\s*["\']?([^;"\']+)["\']?;', style_content)
-                # print(f"Detected @font-face families: {font_face_families}")
+        if '@font-face' in page.style_text:
+            typography["custom_fonts_detected"] = True
+            # Could potentially parse font-family names from @font-face here
+            # font_face_families = re.findall(r'font-family:\s*["\']?([^;"\']+)["\']?;', page.style_text)
 
     except Exception as e:
         print(f"Error extracting font imports: {e}")
@@ -377,7 +696,7 @@ def analyze_layout(driver):
             if isinstance(result, (int, float)):
                 return result
             if isinstance(result, str):
-                numeric_part = re.match(r'^[+-]?(\d*\.)?\d+', result)
+                numeric_part = _LEADING_NUMBER_RE.match(result)
                 if numeric_part:
                     return float(numeric_part.group(0))
             return default
@@ -390,17 +709,17 @@ def analyze_layout(driver):
 
     # Analyze main container width (often not 100% of viewport)
     try:
-        # Look for common container selectors
-        main_elements = driver.find_elements("css selector", "main, .main, #main, .container, #container, .content, #content, .wrapper, #wrapper")
-        visible_containers = [el for el in main_elements if el.is_displayed()]
-        if visible_containers:
+        # Look for common container selectors; returns the clientWidth of each visible match
+        container_widths = driver.execute_script(_IS_VISIBLE_JS + """
+            return Array.from(document.querySelectorAll(arguments[0])).filter(isVisible).map(el => el.clientWidth);
+        """, "main, .main, #main, .container, #container, .content, #content, .wrapper, #wrapper") or []
+        if container_widths:
             # Find the widest visible container, likely the main one
-            widest_container = max(visible_containers, key=lambda el: safe_get_numeric_script("return arguments[0].clientWidth", el, 0))
-            container_width = safe_get_numeric_script("return arguments[0].clientWidth", widest_container, 0)
+            container_width = max(container_widths)
             # Only record if it's significantly different from page width
             if container_width > 0 and abs(container_width - layout_info["page_dimensions"]["width"]) > 50:
                  layout_info["container_width"] = container_width
-            elif len(visible_containers) == 1: # If only one container found, record its width
+            elif len(container_widths) == 1: # If only one container found, record its width
                  layout_info["container_width"] = container_width
 
     except Exception as e:
@@ -409,36 +728,36 @@ def analyze_layout(driver):
 
     # Analyze grid systems (simple check for common class names)
     try:
-        # Look for common grid/column class patterns
-        potential_grids = driver.find_elements("css selector", ".row, .grid, .columns, [class*='grid-'], [class*='col-'], [class*='span-'], [class*='uk-grid'], [class*='container']")
-        # Check if multiple distinct grid-related elements exist
-        if len(potential_grids) > 5: # Arbitrary threshold suggesting a grid system is likely used
-            layout_info["has_grid_system"] = True
+        # Look for common grid/column class patterns; the script only compares the match count.
+        # Check if multiple distinct grid-related elements exist (arbitrary threshold of 5
+        # suggesting a grid system is likely used)
+        layout_info["has_grid_system"] = bool(driver.execute_script(
+            "return document.querySelectorAll(arguments[0]).length > 5",
+            ".row, .grid, .columns, [class*='grid-'], [class*='col-'], [class*='span-'], [class*='uk-grid'], [class*='container']"
+        ))
     except Exception as e:
         print(f"Error analyzing grid system: {e}")
 
     # Detect common spacing units by analyzing margins and paddings
-    spacing_samples = []
     try:
-        # Sample various common elements
-        elements_to_sample = driver.find_elements("css selector", "p, div, section, article, h1, h2, h3, button, img, li")[:100] # Sample more elements
-
-        for element in elements_to_sample:
-            try:
-                # Check only visible elements
-                if not element.is_displayed():
-                    continue
-
-                # Get various margin/padding values
-                styles_to_check = ["marginTop", "marginBottom", "marginLeft", "marginRight",
-                                   "paddingTop", "paddingBottom", "paddingLeft", "paddingRight"]
-                for style_prop in styles_to_check:
-                    value = driver.execute_script(f"return window.getComputedStyle(arguments[0]).{style_prop}", element)
-                    # Keep only non-zero pixel values for simplicity
-                    if value and value.endswith('px') and float(value.replace('px', '')) > 0:
-                        spacing_samples.append(value)
-            except Exception:
-                continue # Ignore errors for individual elements
+        # Sample various common elements. The whole sampling loop runs in-page: one
+        # getComputedStyle per visible element, all margins/paddings read from it,
+        # and only the non-zero pixel values returned.
+        spacing_samples = driver.execute_script(_IS_VISIBLE_JS + """
+            const elements = Array.from(document.querySelectorAll(arguments[0])).slice(0, arguments[1]);
+            const props = arguments[2], samples = [];
+            for (const el of elements) {
+                if (!isVisible(el)) continue; // Check only visible elements
+                const style = window.getComputedStyle(el);
+                for (const prop of props) {
+                    const value = style[prop];
+                    if (value && value.endsWith('px') && parseFloat(value) > 0) samples.push(value);
+                }
+            }
+            return samples;
+        """, "p, div, section, article, h1, h2, h3, button, img, li", 100,
+            ["marginTop", "marginBottom", "marginLeft", "marginRight",
+             "paddingTop", "paddingBottom", "paddingLeft", "paddingRight"]) or []
 
         # Count occurrences to find common spacing units
         if spacing_samples:
@@ -451,13 +770,13 @@ def analyze_layout(driver):
 
     return layout_info
 
-def detect_component_patterns(driver, html_content):
+def detect_component_patterns(driver, page):
     """
     Detect common UI components and their styling patterns.
 
     Args:
         driver: Selenium webdriver instance
-        html_content: HTML content
+        page: PageContext for the page
 
     Returns:
         dict: Component specifications
@@ -470,152 +789,103 @@ def detect_component_patterns(driver, html_content):
         "detected_css_patterns": [] # Renamed for clarity
     }
 
-    # Helper to safely get computed style
-    def get_style(element, prop):
-        try:
-            # Ensure element is interactable/visible before getting style
-            if element.is_displayed():
-                return driver.execute_script(f"return window.getComputedStyle(arguments[0]).{prop}", element)
-        except Exception:
-            pass # Ignore errors like StaleElementReferenceException
-        return None
+    # Selectors and computed-style properties sampled for each component type
+    component_selectors = {
+        "buttons": "button, .button, .btn, [class*='button'], [class*='btn'], input[type='button'], input[type='submit'], a[role='button']",
+        "cards": ".card, [class*='card'], article, .panel, [class*='panel'], .box, [class*='box'], .widget, [class*='widget']",
+        "inputs": "input[type='text'], input[type='email'], input[type='password'], input[type='search'], textarea, select",
+        "navigation": "nav, header, .navigation, .navbar, #navbar, #main-nav, .main-navigation, .header, #header"
+    }
+    component_props = {
+        "buttons": ["backgroundColor", "color", "padding", "border", "borderRadius", "fontSize", "fontWeight", "textTransform"],
+        "cards": ["backgroundColor", "boxShadow", "borderRadius", "padding", "border"],
+        "inputs": ["border", "borderRadius", "padding", "backgroundColor", "fontSize"],
+        "navigation": ["backgroundColor", "boxShadow"]
+    }
 
-    # Analyze buttons
+    # Returns the requested computed styles of the first visible element of every
+    # component type, keyed by type; types with no visible match are left out.
     try:
-        # More comprehensive selector for buttons
-        buttons = driver.find_elements("css selector", "button, .button, .btn, [class*='button'], [class*='btn'], input[type='button'], input[type='submit'], a[role='button']")
-        visible_buttons = [b for b in buttons if b.is_displayed()][:10] # Limit sample size
-
-        if visible_buttons:
-            sample_button = visible_buttons[0] # Use the first visible one as representative
-            button_bg = get_style(sample_button, "backgroundColor")
-            button_color = get_style(sample_button, "color")
-            button_padding = get_style(sample_button, "padding")
-            button_border = get_style(sample_button, "border") # Gets full border shorthand
-            button_radius = get_style(sample_button, "borderRadius")
-            button_font_size = get_style(sample_button, "fontSize")
-            button_font_weight = get_style(sample_button, "fontWeight")
-            button_text_transform = get_style(sample_button, "textTransform")
-
-            components["buttons"] = {
-                "background_color": rgb_to_hex(button_bg) if button_bg else None,
-                "text_color": rgb_to_hex(button_color) if button_color else None,
-                "padding": button_padding,
-                "border": button_border,
-                "border_radius": button_radius,
-                "font_size": button_font_size,
-                "font_weight": button_font_weight,
-                "text_transform": button_text_transform
+        samples = driver.execute_script(_IS_VISIBLE_JS + """
+            const selectors = arguments[0], props = arguments[1], result = {};
+            for (const [type, selector] of Object.entries(selectors)) {
+                const el = Array.from(document.querySelectorAll(selector)).find(isVisible);
+                if (!el) continue;
+                const style = window.getComputedStyle(el), sample = {};
+                for (const prop of props[type]) sample[prop] = style[prop];
+                if (type === 'navigation') {
+                    // Use getBoundingClientRect for more reliable height
+                    sample.height = el.getBoundingClientRect().height;
+                    // Analyze link styles within the nav
+                    const link = el.querySelector('a');
+                    sample.linkColor = link && isVisible(link) ? window.getComputedStyle(link).color : null;
+                }
+                result[type] = sample;
             }
+            return result;
+        """, component_selectors, component_props) or {}
     except Exception as e:
-        print(f"Error analyzing buttons: {e}")
+        print(f"Error sampling component styles: {e}")
+        samples = {}
+
+    button = samples.get("buttons")
+    if button:
+        components["buttons"] = {
+            "background_color": rgb_to_hex(button["backgroundColor"]) if button["backgroundColor"] else None,
+            "text_color": rgb_to_hex(button["color"]) if button["color"] else None,
+            "padding": button["padding"],
+            "border": button["border"], # Full border shorthand
+            "border_radius": button["borderRadius"],
+            "font_size": button["fontSize"],
+            "font_weight": button["fontWeight"],
+            "text_transform": button["textTransform"]
+        }
 
-    # Analyze card-like components
-    try:
-        # Common selectors for cards/panels
-        cards = driver.find_elements("css selector", ".card, [class*='card'], article, .panel, [class*='panel'], .box, [class*='box'], .widget, [class*='widget']")
-        visible_cards = [c for c in cards if c.is_displayed()][:10] # Limit sample size
-
-        if visible_cards:
-            sample_card = visible_cards[0]
-            card_bg = get_style(sample_card, "backgroundColor")
-            card_shadow = get_style(sample_card, "boxShadow")
-            card_radius = get_style(sample_card, "borderRadius")
-            card_padding = get_style(sample_card, "padding")
-            card_border = get_style(sample_card, "border")
-
-            components["cards"] = {
-                "background_color": rgb_to_hex(card_bg) if card_bg else None,
-                "box_shadow": card_shadow if card_shadow != 'none' else None, # Store only if shadow exists
-                "border_radius": card_radius,
-                "padding": card_padding,
-                "border": card_border
-            }
-    except Exception as e:
-        print(f"Error analyzing cards: {e}")
+    card = samples.get("cards")
+    if card:
+        components["cards"] = {
+            "background_color": rgb_to_hex(card["backgroundColor"]) if card["backgroundColor"] else None,
+            "box_shadow": card["boxShadow"] if card["boxShadow"] != 'none' else None, # Store only if shadow exists
+            "border_radius": card["borderRadius"],
+            "padding": card["padding"],
+            "border": card["border"]
+        }
 
-    # Analyze form input styles
-    try:
-        # Select common input types
-        inputs = driver.find_elements("css selector", "input[type='text'], input[type='email'], input[type='password'], input[type='search'], textarea, select")
-        visible_inputs = [i for i in inputs if i.is_displayed()][:10] # Limit sample size
-
-        if visible_inputs:
-            sample_input = visible_inputs[0]
-            input_border = get_style(sample_input, "border")
-            input_radius = get_style(sample_input, "borderRadius")
-            input_padding = get_style(sample_input, "padding")
-            input_bg = get_style(sample_input, "backgroundColor")
-            input_font_size = get_style(sample_input, "fontSize")
-
-            components["forms"]["inputs"] = {
-                "border": input_border,
-                "border_radius": input_radius,
-                "padding": input_padding,
-                "background_color": rgb_to_hex(input_bg) if input_bg else None,
-                "font_size": input_font_size
-            }
-    except Exception as e:
-        print(f"Error analyzing form inputs: {e}")
+    form_input = samples.get("inputs")
+    if form_input:
+        components["forms"]["inputs"] = {
+            "border": form_input["border"],
+            "border_radius": form_input["borderRadius"],
+            "padding": form_input["padding"],
+            "background_color": rgb_to_hex(form_input["backgroundColor"]) if form_input["backgroundColor"] else None,
+            "font_size": form_input["fontSize"]
+        }
 
-    # Analyze navigation styles
-    try:
-        # Common navigation selectors
-        navs = driver.find_elements("css selector", "nav, header, .navigation, .navbar, #navbar, #main-nav, .main-navigation, .header, #header")
-        visible_navs = [n for n in navs if n.is_displayed()]
-
-        if visible_navs:
-            # Often the first one is the main nav/header
-            sample_nav = visible_navs[0]
-            nav_bg = get_style(sample_nav, "backgroundColor")
-            # Use getBoundingClientRect for more reliable height
-            nav_height = driver.execute_script("return arguments[0].getBoundingClientRect().height", sample_nav)
-            nav_shadow = get_style(sample_nav, "boxShadow")
-            # Analyze link styles within the nav
-            nav_links = sample_nav.find_elements("css selector", "a")
-            nav_link_color = None
-            if nav_links and nav_links[0].is_displayed():
-                nav_link_color = get_style(nav_links[0], "color")
-
-
-            components["navigation"] = {
-                "background_color": rgb_to_hex(nav_bg) if nav_bg else None,
-                "height": f"{nav_height:.0f}px" if nav_height else None,
-                "box_shadow": nav_shadow if nav_shadow != 'none' else None,
-                "link_color": rgb_to_hex(nav_link_color) if nav_link_color else None
-            }
-    except Exception as e:
-        print(f"Error analyzing navigation: {e}")
+    nav = samples.get("navigation")
+    if nav:
+        # Often the first one is the main nav/header
+        components["navigation"] = {
+            "background_color": rgb_to_hex(nav["backgroundColor"]) if nav["backgroundColor"] else None,
+            "height": f"{nav['height']:.0f}px" if nav["height"] else None,
+            "box_shadow": nav["boxShadow"] if nav["boxShadow"] != 'none' else None,
+            "link_color": rgb_to_hex(nav["linkColor"]) if nav["linkColor"] else None
+        }
 
     # Detect common CSS class patterns (utility classes, BEM, etc.)
     try:
-        class_pattern = re.compile(r'class=["\']([^"\']+)["\']')
-        # Find all class attributes in the HTML
-        class_matches = class_pattern.findall(html_content)
-
-        all_classes = []
-        for match in class_matches:
-            # Split multi-class strings and clean up whitespace
-            classes = [c.strip() for c in match.split()]
-            all_classes.extend(classes)
-
-        # Count occurrences
-        if all_classes:
-            class_counter = Counter(all_classes)
+        # Class occurrences were counted while building the page context
+        class_counter = page.class_counts
 
+        if class_counter:
             # Find potential utility classes or common prefixes/suffixes
             common_patterns = []
-            # Common prefixes/indicators for utility classes or frameworks
-            utility_indicators = ['text-', 'bg-', 'p-', 'm-', 'flex', 'grid', 'border', 'rounded', 'w-', 'h-', 'font-', 'shadow', 'item', 'container', 'row', 'col-', 'nav-', 'btn-', 'card-', 'form-']
 
             # Get top 50 most common classes
             for cls, count in class_counter.most_common(50):
-                 # Add if it appears frequently (e.g., > 5 times) and matches a common pattern
-                if count > 5:
-                    if any(indicator in cls for indicator in utility_indicators):
-                         # Basic filtering to avoid overly generic or single-letter classes
-                        if len(cls) > 2:
-                            common_patterns.append(cls)
+                # Add if it appears frequently (e.g., > 5 times) and matches a common pattern.
+                # Basic length filtering avoids overly generic or single-letter classes.
+                if count > 5 and len(cls) > 2 and _UTILITY_CLASS_RE.search(cls):
+                    common_patterns.append(cls)
 
             # Limit to top 15 relevant patterns found
             components["detected_css_patterns"] = common_patterns[:15]
@@ -624,13 +894,33 @@ def detect_component_patterns(driver, html_content):
 
     return components
 
-def analyze_images_and_icons(driver, html_content):
+# Class name patterns of common icon fonts
+_ICON_FONT_PATTERNS = (
+    'fa-', 'fas', 'far', 'fal', 'fab', # FontAwesome
+    'glyphicon',                     # Bootstrap 3
+    'material-icons',                # Material Design Icons
+    'icon-',                         # Generic prefix
+    'icofont-',                      # IcoFont
+    'bi-',                           # Bootstrap Icons
+    'feather',                       # Feather Icons
+    'mdi-'                           # Material Design Icons (alternative)
+)
+
+# Comprehensive logo selectors, tried in order
+_LOGO_SELECTORS = (
+    ".logo", "#logo", "[class*='logo']", "[id*='logo']",
+    "header img[alt*='logo' i]", "nav img[alt*='logo' i]",
+    "header a[href='/'] img", "nav a[href='/'] img", # Logo often links to homepage
+    "[aria-label*='logo' i]", "img[src*='logo']"
+)
+
+def analyze_images_and_icons(driver, page):
     """
     Analyze images and icons for style patterns.
 
     Args:
         driver: Selenium webdriver instance
-        html_content: HTML content
+        page: PageContext for the page
 
     Returns:
         dict: Image and icon specifications
@@ -644,57 +934,41 @@ def analyze_images_and_icons(driver, html_content):
         "logo_url": None # Added to store logo URL
     }
 
-    # Helper to safely get style
-    def get_style(element, prop):
-        try:
-            if element.is_displayed():
-                return driver.execute_script(f"return window.getComputedStyle(arguments[0]).{prop}", element)
-        except Exception:
-            pass
-        return None
-
     # Check for SVG usage (both inline <svg> and <img> with .svg src)
     try:
-        svg_elements = driver.find_elements("css selector", "svg")
-        img_svgs = driver.find_elements("css selector", "img[src$='.svg']")
-        if svg_elements or img_svgs:
+        # Existence check only: true if any inline <svg> or .svg <img> is present
+        if driver.execute_script("return document.querySelector(\"svg, img[src$='.svg']\") !== null"):
             image_info["has_svg_icons"] = True
     except Exception as e:
         print(f"Error checking for SVG icons: {e}")
 
     # Check for common icon fonts by looking for specific class prefixes/patterns
     try:
-        icon_font_patterns = [
-            'fa-', 'fas', 'far', 'fal', 'fab', # FontAwesome
-            'glyphicon',                     # Bootstrap 3
-            'material-icons',                # Material Design Icons
-            'icon-',                         # Generic prefix
-            'icofont-',                      # IcoFont
-            'bi-',                           # Bootstrap Icons
-            'feather',                       # Feather Icons
-            'mdi-'                           # Material Design Icons (alternative)
-        ]
-        # Search for elements with class attributes containing these patterns
-        icon_elements_found = False
-        for pattern in icon_font_patterns:
-            # Use contains selector for efficiency
-            selector = f"[class*='{pattern}']"
-            try:
-                icon_elements = driver.find_elements("css selector", selector)
-                # Check if any found elements are likely icons (e.g., <i> or <span> tags)
-                if any(el.tag_name in ['i', 'span'] for el in icon_elements[:10]): # Check first 10 matches
-                    image_info["has_icon_font"] = True
-                    icon_elements_found = True
-                    # Extract specific classes from a sample
-                    sample_icon = icon_elements[0]
-                    classes = sample_icon.get_attribute('class').split()
-                    image_info["icon_classes_found"].extend([cls for cls in classes if pattern in cls])
-                    # break # Found one type, could stop or continue searching for others
-            except Exception:
-                continue # Ignore errors for specific patterns
-
-        # Limit stored icon classes
-        image_info["icon_classes_found"] = list(set(image_info["icon_classes_found"]))[:10]
+        # Search for likely icon elements (<i> or <span> tags) with class attributes containing
+        # these patterns. The tag filter is part of the selector, so the page only returns tag-correct
+        # matches. The patterns are probed in a single script call that stops at the first confirmed
+        # icon font and returns that pattern with the classes of its first matching element.
+        icon_match = driver.execute_script("""
+            for (const pattern of arguments[0]) {
+                const icon = document.querySelector('i[class*="' + pattern + '"], span[class*="' + pattern + '"]');
+                if (icon) {
+                    return [pattern, icon.getAttribute('class') || ''];
+                }
+            }
+            return null;
+        """, list(_ICON_FONT_PATTERNS))
+
+        if icon_match:
+            pattern, sample_classes = icon_match
+            image_info["has_icon_font"] = True
+            # Extract specific classes from a sample, deduplicated and limited to 10 as they stream in
+            icon_class_set = set()
+            for cls in sample_classes.split():
+                if pattern in cls:
+                    icon_class_set.add(cls)
+                    if len(icon_class_set) >= 10:
+                        break
+            image_info["icon_classes_found"] = list(icon_class_set)
 
     except Exception as e:
         print(f"Error checking for icon fonts: {e}")
@@ -702,15 +976,28 @@ def analyze_images_and_icons(driver, html_content):
 
     # Analyze image styling (border-radius, shadow, border)
     try:
-        images = driver.find_elements("css selector", "img")
-        visible_images = [img for img in images if img.is_displayed() and int(img.size['width']) > 20 and int(img.size['height']) > 20][:10] # Sample visible images > 20x20px
+        # Returns the styles of the first visible image larger than 20x20px, or null
+        img_styles = driver.execute_script(_IS_VISIBLE_JS + """
+            for (const img of document.getElementsByTagName('img')) {
+                const rect = img.getBoundingClientRect();
+                if (rect.width > 20 && rect.height > 20 && isVisible(img)) {
+                    const style = window.getComputedStyle(img);
+                    return {
+                        borderRadius: style.borderRadius,
+                        boxShadow: style.boxShadow,
+                        border: style.border,
+                        filter: style.filter // Check for filters too
+                    };
+                }
+            }
+            return null;
+        """)
 
-        if visible_images:
-            sample_image = visible_images[0]
-            img_border_radius = get_style(sample_image, "borderRadius")
-            img_shadow = get_style(sample_image, "boxShadow")
-            img_border = get_style(sample_image, "border")
-            img_filter = get_style(sample_image, "filter") # Check for filters too
+        if img_styles:
+            img_border_radius = img_styles.get("borderRadius")
+            img_shadow = img_styles.get("boxShadow")
+            img_border = img_styles.get("border")
+            img_filter = img_styles.get("filter")
 
             image_info["image_style"] = {
                 "border_radius": img_border_radius if img_border_radius != '0px' else None,
@@ -723,50 +1010,53 @@ def analyze_images_and_icons(driver, html_content):
 
     # Look for logo (typically in header/nav, with class/id/alt containing 'logo')
     try:
-        # Comprehensive logo selectors
-        logo_selectors = [
-            ".logo", "#logo", "[class*='logo']", "[id*='logo']",
-            "header img[alt*='logo' i]", "nav img[alt*='logo' i]",
-            "header a[href='/'] img", "nav a[href='/'] img", # Logo often links to homepage
-            "[aria-label*='logo' i]", "img[src*='logo']"
-        ]
-        logo_element = None
-        for selector in logo_selectors:
-            try:
-                elements = driver.find_elements("css selector", selector)
-                visible_logos = [el for el in elements if el.is_displayed()]
-                if visible_logos:
-                    logo_element = visible_logos[0] # Take the first visible match
-                    break
-            except Exception:
-                continue # Ignore errors for specific selectors
+        # Returns tag, src, inner <img> src, background image and base URL of the first visible logo match, or null
+        logo_element = driver.execute_script(_IS_VISIBLE_JS + """
+            for (const selector of arguments[0]) {
+                let matches;
+                try {
+                    matches = document.querySelectorAll(selector);
+                } catch (e) {
+                    continue; // Ignore invalid selectors
+                }
+                for (const el of matches) {
+                    if (!isVisible(el)) continue;
+                    const innerImg = el.tagName.toLowerCase() === 'a' ? el.querySelector('img') : null;
+                    return {
+                        tag: el.tagName.toLowerCase(),
+                        src: el.getAttribute('src') !== null ? el.src : null,
+                        innerImgSrc: innerImg ? innerImg.src : null,
+                        bg: window.getComputedStyle(el).backgroundImage,
+                        baseUrl: document.baseURI
+                    };
+                }
+            }
+            return null;
+        """, list(_LOGO_SELECTORS))
 
         if logo_element:
             image_info["logo_detected"] = True
             logo_url = None
-            if logo_element.tag_name == 'img':
-                logo_url = logo_element.get_attribute("src")
-            elif logo_element.tag_name == 'a' and logo_element.find_elements("css selector", "img"):
+            if logo_element["tag"] == 'img':
+                logo_url = logo_element["src"]
+            elif logo_element["tag"] == 'a' and logo_element["innerImgSrc"] is not None:
                  # If logo is an image inside a link
-                 logo_img = logo_element.find_element("css selector", "img")
-                 logo_url = logo_img.get_attribute("src")
-            elif logo_element.tag_name == 'svg':
+                 logo_url = logo_element["innerImgSrc"]
+            elif logo_element["tag"] == 'svg':
                  # Could try to get outerHTML for inline SVG logo
                  # logo_url = "inline SVG detected"
                  pass # Indicate SVG logo presence via has_svg_icons
             else:
                 # Check for background image logo
-                logo_bg = get_style(logo_element, "backgroundImage")
+                logo_bg = logo_element["bg"]
                 if logo_bg and logo_bg != 'none':
-                    bg_url_match = re.search(r'url\("?([^")]+)"?\)', logo_bg)
+                    bg_url_match = _BG_URL_RE.search(logo_bg)
                     if bg_url_match:
                         logo_url = bg_url_match.group(1)
 
             # Resolve relative URL if needed
             if logo_url and not logo_url.startswith(('http:', 'https:', 'data:')):
-                from urllib.parse import urljoin
-                base_url = driver.current_url
-                logo_url = urljoin(base_url, logo_url)
+                logo_url = urljoin(logo_element["baseUrl"], logo_url)
 
             image_info["logo_url"] = logo_url
 
@@ -775,6 +1065,17 @@ def analyze_images_and_icons(driver, html_content):
 
     return image_info
 
+# Major heading levels, in the order used to pick the primary heading font
+_HEADING_PRIORITY = ('h1', 'h2', 'h3')
+
+def _primary_heading_font(typography, default=None):
+    """Return the font family of the highest-priority heading present, or default if there is none."""
+    headings = typography.get("headings") or {}
+    for h_tag in _HEADING_PRIORITY:
+        if h_tag in headings:
+            return headings[h_tag].get("font_family", default)
+    return default
+
 def generate_design_schema(url, colors, typography, layout, components, images):
     """
     Combine all extracted information into a comprehensive design schema.
@@ -844,17 +1145,11 @@ def generate_design_schema(url, colors, typography, layout, components, images):
 
     # Typography style (Serif vs. Sans-Serif)
     # Check primary heading font first, then body font
-    heading_font = None
-    if typography.get("headings"):
-        for h_tag in ['h1', 'h2', 'h3']: # Check major headings
-            if h_tag in typography["headings"]:
-                heading_font = typography["headings"][h_tag].get("font_family", "").lower()
-                break
+    heading_font = _primary_heading_font(typography, "").lower()
     if not heading_font: # Fallback to body font if no heading font found
         heading_font = typography.get("body", {}).get("font_family", "").lower()
 
-    serif_indicators = ["serif", "georgia", "times", "palatino", "bookman", "charter"]
-    if any(indicator in heading_font for indicator in serif_indicators):
+    if _SERIF_RE.search(heading_font):
         keywords.add("serif-typography")
     else:
         keywords.add("sans-serif-typography")
@@ -878,164 +1173,172 @@ def generate_design_schema(url, colors, typography, layout, components, images):
 
     return schema
 
-def validate_schema(design_schema):
-    """
-    Validate the generated schema against a defined JSON schema.
-
-    Args:
-        design_schema: The generated design schema dictionary
-
-    Returns:
-        bool: True if validation passes, False otherwise
-    """
-    # Define the expected JSON schema structure
-    # This should align with the structure produced by generate_design_schema
-    json_schema = {
-        "type": "object",
-        "required": ["metadata", "colors", "typography", "layout", "components", "images", "design_summary"],
-        "properties": {
-            "metadata": {
-                "type": "object",
-                "required": ["source_url", "extraction_date", "schema_version"],
-                "properties": {
-                    "source_url": {"type": "string", "format": "uri"},
-                    "extraction_date": {"type": "string", "format": "date-time"},
-                    "schema_version": {"type": "string"},
-                    "cms": { # Optional CMS info from plugins
-                        "type": "object",
-                        "properties": {
-                            "type": {"type": "string"},
-                            "theme": {"type": "string"}
-                        }
+# Expected JSON schema structure, checked by validate_schema
+# This should align with the structure produced by generate_design_schema
+_DESIGN_JSON_SCHEMA = {
+    "type": "object",
+    # Shared value formats, referenced with $ref so each pattern is declared once
+    "definitions": {
+        "hexColor": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"},
+        "pxValue": {"type": "string", "pattern": r"^\d+(\.\d+)?px$"}
+    },
+    "required": ["metadata", "colors", "typography", "layout", "components", "images", "design_summary"],
+    "properties": {
+        "metadata": {
+            "type": "object",
+            "required": ["source_url", "extraction_date", "schema_version"],
+            "properties": {
+                "source_url": {"type": "string", "format": "uri"},
+                "extraction_date": {"type": "string", "format": "date-time"},
+                "schema_version": {"type": "string"},
+                "cms": { # Optional CMS info from plugins
+                    "type": "object",
+                    "properties": {
+                        "type": {"type": "string"},
+                        "theme": {"type": "string"}
                     }
                 }
-            },
-            "colors": {
-                "type": "object",
-                "required": ["primary_color", "secondary_color", "accent_color", "background_color", "text_color", "palette"],
-                "properties": {
-                    "primary_color": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"},
-                    "secondary_color": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"},
-                    "accent_color": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"},
-                    "background_color": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"},
-                    "text_color": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"},
-                    "palette": {
-                        "type": "array",
-                        "items": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"}
-                    }
+            }
+        },
+        "colors": {
+            "type": "object",
+            "required": ["primary_color", "secondary_color", "accent_color", "background_color", "text_color", "palette"],
+            "properties": {
+                "primary_color": {"$ref": "#/definitions/hexColor"},
+                "secondary_color": {"$ref": "#/definitions/hexColor"},
+                "accent_color": {"$ref": "#/definitions/hexColor"},
+                "background_color": {"$ref": "#/definitions/hexColor"},
+                "text_color": {"$ref": "#/definitions/hexColor"},
+                "palette": {
+                    "type": "array",
+                    "items": {"$ref": "#/definitions/hexColor"}
                 }
-            },
-            "typography": {
-                "type": "object",
-                "required": ["headings", "body", "font_imports", "custom_fonts_detected"],
-                 "properties": {
-                    "headings": {
-                        "type": "object",
-                        # Properties for h1, h2, etc. are dynamic but should follow this pattern:
-                        "additionalProperties": {
-                            "type": "object",
-                            "required": ["font_family", "font_size", "font_weight"],
-                            "properties": {
-                                "font_family": {"type": "string"},
-                                "font_size": {"type": "string"},
-                                "font_weight": {"type": ["string", "number"]} # Weight can be numeric or string (e.g., 'bold')
-                            }
-                        }
-                    },
-                    "body": {
+            }
+        },
+        "typography": {
+            "type": "object",
+            "required": ["headings", "body", "font_imports", "custom_fonts_detected"],
+             "properties": {
+                "headings": {
+                    "type": "object",
+                    # Properties for h1, h2, etc. are dynamic but should follow this pattern:
+                    "additionalProperties": {
                         "type": "object",
-                        "required": ["font_family", "font_size", "font_weight", "line_height"],
+                        "required": ["font_family", "font_size", "font_weight"],
                         "properties": {
                             "font_family": {"type": "string"},
                             "font_size": {"type": "string"},
-                            "font_weight": {"type": ["string", "number"]},
-                            "line_height": {"type": ["string", "number"]} # Line height can be unitless number or string
+                            "font_weight": {"type": ["string", "number"]} # Weight can be numeric or string (e.g., 'bold')
                         }
-                    },
-                    "font_imports": {"type": "array", "items": {"type": "string"}},
-                    "custom_fonts_detected": {"type": "boolean"}
-                }
-            },
-            "layout": {
-                "type": "object",
-                "required": ["page_dimensions", "has_grid_system", "common_spacing_units"],
-                "properties": {
-                    "page_dimensions": {
-                        "type": "object",
-                        "required": ["width", "height"],
-                        "properties": {
-                            "width": {"type": ["number", "null"]},
-                            "height": {"type": ["number", "null"]}
-                        }
-                    },
-                    "container_width": {"type": ["number", "null"]},
-                    "has_grid_system": {"type": "boolean"},
-                    "common_spacing_units": {
-                        "type": "array",
-                        "items": {"type": "string", "pattern": r"^\d+(\.\d+)?px$"} # Expecting pixel values
                     }
-                }
-            },
-            "components": {
-                "type": "object",
-                "properties": {
-                    "buttons": {"type": "object"}, # Allow flexible properties within components
-                    "cards": {"type": "object"},
-                    "forms": {"type": "object", "properties": {"inputs": {"type": "object"}}},
-                    "navigation": {"type": "object"},
-                    "detected_css_patterns": {"type": "array", "items": {"type": "string"}},
-                    "sidebar": { # Optional from plugins
-                        "type": "object",
-                        "properties": {
-                            "present": {"type": "boolean"},
-                            "width": {"type": ["number", "string", "null"]}
-                        }
+                },
+                "body": {
+                    "type": "object",
+                    "required": ["font_family", "font_size", "font_weight", "line_height"],
+                    "properties": {
+                        "font_family": {"type": "string"},
+                        "font_size": {"type": "string"},
+                        "font_weight": {"type": ["string", "number"]},
+                        "line_height": {"type": ["string", "number"]} # Line height can be unitless number or string
                     }
                 },
-                # No required fields at the top level, as components might not be detected
-            },
-            "images": {
-                "type": "object",
-                "required": ["has_svg_icons", "has_icon_font", "icon_classes_found", "image_style", "logo_detected"],
-                "properties": {
-                    "has_svg_icons": {"type": "boolean"},
-                    "has_icon_font": {"type": "boolean"},
-                    "icon_classes_found": {"type": "array", "items": {"type": "string"}},
-                    "image_style": {"type": "object"}, # Allow flexible properties
-                    "logo_detected": {"type": "boolean"},
-                    "logo_url": {"type": ["string", "null"], "format": "uri-reference"} # Allow null if not found
+                "font_imports": {"type": "array", "items": {"type": "string"}},
+                "custom_fonts_detected": {"type": "boolean"}
+            }
+        },
+        "layout": {
+            "type": "object",
+            "required": ["page_dimensions", "has_grid_system", "common_spacing_units"],
+            "properties": {
+                "page_dimensions": {
+                    "type": "object",
+                    "required": ["width", "height"],
+                    "properties": {
+                        "width": {"type": ["number", "null"]},
+                        "height": {"type": ["number", "null"]}
+                    }
+                },
+                "container_width": {"type": ["number", "null"]},
+                "has_grid_system": {"type": "boolean"},
+                "common_spacing_units": {
+                    "type": "array",
+                    "items": {"$ref": "#/definitions/pxValue"} # Expecting pixel values
                 }
-            },
-            "design_summary": {
-                "type": "object",
-                "required": ["style_keywords"],
-                "properties": {
-                    "style_keywords": {"type": "array", "items": {"type": "string"}}
+            }
+        },
+        "components": {
+            "type": "object",
+            "properties": {
+                "buttons": {"type": "object"}, # Allow flexible properties within components
+                "cards": {"type": "object"},
+                "forms": {"type": "object", "properties": {"inputs": {"type": "object"}}},
+                "navigation": {"type": "object"},
+                "detected_css_patterns": {"type": "array", "items": {"type": "string"}},
+                "sidebar": { # Optional from plugins
+                    "type": "object",
+                    "properties": {
+                        "present": {"type": "boolean"},
+                        "width": {"type": ["number", "string", "null"]}
+                    }
                 }
             },
-             # Optional AI consumption block
-            "ai_consumption": {
-                "type": "object",
-                "properties": {
-                    "descriptions": {"type": "object"},
-                    "color_palette_hex": {"type": "array", "items": {"type": "string", "pattern": "^#[0-9a-fA-F]{6}$"}},
-                    "suggested_prompt_elements": {"type": "array", "items": {"type": "string"}}
-                }
+            # No required fields at the top level, as components might not be detected
+        },
+        "images": {
+            "type": "object",
+            "required": ["has_svg_icons", "has_icon_font", "icon_classes_found", "image_style", "logo_detected"],
+            "properties": {
+                "has_svg_icons": {"type": "boolean"},
+                "has_icon_font": {"type": "boolean"},
+                "icon_classes_found": {"type": "array", "items": {"type": "string"}},
+                "image_style": {"type": "object"}, # Allow flexible properties
+                "logo_detected": {"type": "boolean"},
+                "logo_url": {"type": ["string", "null"], "format": "uri-reference"} # Allow null if not found
+            }
+        },
+        "design_summary": {
+            "type": "object",
+            "required": ["style_keywords"],
+            "properties": {
+                "style_keywords": {"type": "array", "items": {"type": "string"}}
+            }
+        },
+         # Optional AI consumption block
+        "ai_consumption": {
+            "type": "object",
+            "properties": {
+                "descriptions": {"type": "object"},
+                "color_palette_hex": {"type": "array", "items": {"$ref": "#/definitions/hexColor"}},
+                "suggested_prompt_elements": {"type": "array", "items": {"type": "string"}}
             }
         }
     }
+}
+# Validator built once at import time and reused for every page
+_SCHEMA_VALIDATOR = jsonschema.Draft7Validator(_DESIGN_JSON_SCHEMA)
+
+def validate_schema(design_schema):
+    """
+    Validate the generated schema against a defined JSON schema.
+
+    Args:
+        design_schema: The generated design schema dictionary
 
+    Returns:
+        bool: True if validation passes, False otherwise
+    """
     try:
-        jsonschema.validate(instance=design_schema, schema=json_schema)
-        print("Schema validation successful.")
-        return True
-    except jsonschema.exceptions.ValidationError as e:
+        # Report the most relevant error, as jsonschema.validate would
+        error = jsonschema.exceptions.best_match(_SCHEMA_VALIDATOR.iter_errors(design_schema))
+        if error is None:
+            logger.info("Schema validation successful.")
+            return True
         # Provide more detailed validation error info
         print(f"Schema validation failed:")
-        print(f"- Error: {e.message}")
-        print(f"- Path: {list(e.path)}")
-        # print(f"- Schema Path: {list(e.schema_path)}") # Can be verbose
-        # print(f"- Instance Snippet: {e.instance}") # Can be large
+        print(f"- Error: {error.message}")
+        print(f"- Path: {list(error.path)}")
+        # print(f"- Schema Path: {list(error.schema_path)}") # Can be verbose
+        # print(f"- Instance Snippet: {error.instance}") # Can be large
         return False
     except Exception as e:
         print(f"An unexpected error occurred during schema validation: {e}")
@@ -1062,72 +1365,143 @@ def safe_execute_script(driver, script, element=None, default=None):
             if not isinstance(element, webdriver.remote.webelement.WebElement):
                  print(f"Invalid element passed to safe_execute_script: {type(element)}")
                  return default
-            # Basic check if element might be stale (though not foolproof)
-            try:
-                 _ = element.is_enabled()
-            except:
-                 print("Element seems stale in safe_execute_script.")
-                 return default
             return driver.execute_script(script, element)
         else:
             return driver.execute_script(script)
+    except StaleElementReferenceException:
+        # Detected on the script call itself rather than with an extra liveness probe
+        print("Element seems stale in safe_execute_script.")
+        return default
     except Exception as e:
         # Don't print every script error, can be noisy
         # print(f"Script execution error: {script[:50]}... - {e}")
         return default
 
-def determine_website_type(html_content, url):
+def get_styles_batch(driver, element, props):
+    """
+    Read several computed style properties of an element with a single script call.
+
+    Args:
+        driver: Selenium webdriver instance
+        element: WebElement to read the styles from
+        props: Computed style property names in camelCase (e.g. "fontSize")
+
+    Returns:
+        dict: Maps each property name to its computed value, or an empty dict if the script fails
+    """
+    try:
+        return driver.execute_script("""
+            const style = window.getComputedStyle(arguments[0]);
+            const values = {};
+            for (const prop of arguments[1]) values[prop] = style[prop];
+            return values;
+        """, element, list(props)) or {}
+    except Exception:
+        return {}
+
+def find_visible_elements(driver, selector, limit=_MAX_VISIBLE_ELEMENTS):
+    """
+    Find visible elements matching a CSS selector with a single script call.
+    Visibility filtering and the size limit are applied in the page, so only the
+    element handles that are actually needed are sent back over the WebDriver wire.
+
+    Args:
+        driver: Selenium webdriver instance
+        selector: CSS selector to match
+        limit: Maximum number of elements to return
+
+    Returns:
+        list: Visible WebElements in document order, or an empty list if the query fails
+    """
+    try:
+        return driver.execute_script(_IS_VISIBLE_JS + """
+            return Array.from(document.querySelectorAll(arguments[0])).filter(isVisible).slice(0, arguments[1]);
+        """, selector, limit) or []
+    except Exception:
+        return []
+
+# Common CMS or frameworks, checked first (more specific) by determine_website_type.
+# Order matters - check specific CMS before general frameworks
+_CMS_PATTERNS = (
+    ("wordpress", r'wp-content|wordpress|wp-includes'),
+    ("shopify", r'cdn\.shopify\.com|myshopify\.com'),
+    ("wix", r'wix\.com|wixstatic\.com|wixsite\.com'),
+    ("squarespace", r'squarespace\.com|static1\.squarespace\.com'),
+    ("webflow", r'webflow\.io|webflow\.com'),
+    ("joomla", r'joomla|com_content'),
+    ("drupal", r'drupal\.js|sites/default/files'),
+    # Frameworks (less specific than CMS)
+    ("tailwind", r'tailwindcss|tailwind\.css'), # Utility classes are checked in _CMS_CLASS_PATTERNS
+    ("bootstrap", r'bootstrap\.min\.css|bootstrap\.bundle\.min\.js'),
+    ("react", r'react-root|data-reactid'),
+    ("vue", r'data-v-'),
+    ("angular", r'ng-version'),
+    ("material", r'material-design|mdl-|mui-'),
+)
+# All CMS patterns as one alternation of named groups, so the HTML is scanned once.
+# The alternation sits in a lookahead: matches are zero-width and cannot hide each other,
+# and at any position the first (highest priority) matching pattern is reported.
+_CMS_RE = re.compile(
+    '(?=' + '|'.join(f'(?P<{type_key}>{pattern})' for type_key, pattern in _CMS_PATTERNS) + ')',
+    re.IGNORECASE
+)
+_CMS_PRIORITY = {type_key: priority for priority, (type_key, _) in enumerate(_CMS_PATTERNS)}
+# Class-name indicators, matched against the class tokens collected in PageContext rather
+# than with class="[^"]*..." scans over the raw HTML. Same priority order as _CMS_PATTERNS.
+_CMS_CLASS_PATTERNS = (
+    ("tailwind", re.compile(r'flex|grid|p-|m-|text-|bg-', re.IGNORECASE)), # Look for utility classes
+    ("bootstrap", re.compile(r'container|row|col-', re.IGNORECASE)),
+)
+_ECOMMERCE_RE = re.compile(r'cart|checkout|product|shop|store|price|add to cart|woocommerce', re.IGNORECASE)
+_BLOG_RE = re.compile(r'blog|article|post|author|comment|category|archive', re.IGNORECASE)
+
+def determine_website_type(page):
     """
     Determine the type/category of website to better tailor analysis.
     Very basic detection based on common patterns.
 
     Args:
-        html_content: HTML content of the page
-        url: URL of the website
+        page: PageContext for the page (HTML content, URL and class names)
 
     Returns:
         str: Website type category (e.g., 'wordpress', 'shopify', 'ecommerce', 'blog', 'general')
     """
-    # Check for common CMS or frameworks first (more specific)
-    # Order matters - check specific CMS before general frameworks
-    cms_patterns = {
-        "wordpress": r'wp-content|wordpress|wp-includes',
-        "shopify": r'cdn\.shopify\.com|myshopify\.com',
-        "wix": r'wix\.com|wixstatic\.com|wixsite\.com',
-        "squarespace": r'squarespace\.com|static1\.squarespace\.com',
-        "webflow": r'webflow\.io|webflow\.com',
-        "joomla": r'joomla|com_content',
-        "drupal": r'drupal\.js|sites/default/files',
-        # Frameworks (less specific than CMS)
-        "tailwind": r'tailwindcss|tailwind\.css|class="[^"]*(?:flex|grid|p-|m-|text-|bg-)', # Look for utility classes
-        "bootstrap": r'bootstrap\.min\.css|bootstrap\.bundle\.min\.js|class="[^"]*(?:container|row|col-)',
-        "react": r'react-root|data-reactid',
-        "vue": r'data-v-',
-        "angular": r'ng-version',
-        "material": r'material-design|mdl-|mui-'
-    }
+    html_content, url = page.html_content, page.url
 
-    # Check CMS/Framework patterns
-    for type_key, pattern in cms_patterns.items():
-        try:
-            if re.search(pattern, html_content, re.IGNORECASE):
-                return type_key
-        except Exception: # Catch potential regex errors on weird HTML
-            continue
+    # Check CMS/Framework patterns in a single pass, keeping the highest priority match
+    detected_type = None
+    try:
+        for match in _CMS_RE.finditer(html_content):
+            type_key = match.lastgroup
+            if detected_type is None or _CMS_PRIORITY[type_key] < _CMS_PRIORITY[detected_type]:
+                detected_type = type_key
+                if _CMS_PRIORITY[type_key] == 0:
+                    break # Highest priority type found, nothing can beat it
+    except Exception: # Catch potential regex errors on weird HTML
+        pass
+
+    # Check class-name indicators unless a higher priority type was already found
+    class_names = " ".join(page.class_counts)
+    for type_key, pattern in _CMS_CLASS_PATTERNS:
+        if detected_type is not None and _CMS_PRIORITY[detected_type] <= _CMS_PRIORITY[type_key]:
+            break
+        if pattern.search(class_names):
+            detected_type = type_key
+            break
+
+    if detected_type:
+        return detected_type
 
     # Check for e-commerce indicators if no specific CMS/framework found
-    ecommerce_patterns = r'cart|checkout|product|shop|store|price|add to cart|woocommerce'
-    if re.search(ecommerce_patterns, html_content, re.IGNORECASE):
+    if _ECOMMERCE_RE.search(html_content):
         return "ecommerce"
 
     # Check for blog indicators
-    blog_patterns = r'blog|article|post|author|comment|category|archive'
-    if re.search(blog_patterns, html_content, re.IGNORECASE):
+    if _BLOG_RE.search(html_content):
         return "blog"
 
     # Check URL TLD for clues (less reliable)
     try:
-        from urllib.parse import urlparse
         domain = urlparse(url).netloc
         if domain:
             if '.gov' in domain: return "government"
@@ -1139,7 +1513,14 @@ def determine_website_type(html_content, url):
     return "general" # Default type
 
 class DesignSchemeExtractorPlugin:
-    """Base class for design scheme extractor plugins."""
+    """
+    Base class for design scheme extractor plugins.
+
+    Plugins are made available with register_plugin() and run by enhance_with_plugins
+    sequentially, in registration order, on the thread that owns the webdriver. Each
+    enhance_schema call receives the schema returned by the previous plugin and may
+    modify it in place, so plugins are never run concurrently.
+    """
     plugin_name = "base_plugin" # Give each plugin a name
 
     def __init__(self, applicable_types):
@@ -1169,9 +1550,12 @@ class DesignSchemeExtractorPlugin:
         Returns:
             dict: Enhanced design schema dictionary
         """
-        print(f"Applying plugin: {self.plugin_name} (Base implementation - does nothing)")
+        logger.info("Applying plugin: %s (Base implementation - does nothing)", self.plugin_name)
         return design_schema
 
+# Common WordPress sidebar containers
+_WP_SIDEBAR_SELECTOR = ".widget-area, .sidebar, #sidebar, #secondary"
+
 # Example plugin for WordPress sites
 class WordPressPlugin(DesignSchemeExtractorPlugin):
     plugin_name = "wordpress_enhancer"
@@ -1180,13 +1564,13 @@ class WordPressPlugin(DesignSchemeExtractorPlugin):
         super().__init__("wordpress") # This plugin applies only to 'wordpress' type
 
     def enhance_schema(self, design_schema, html_content, driver=None):
-        print(f"Applying plugin: {self.plugin_name}")
+        logger.info("Applying plugin: %s", self.plugin_name)
         # Ensure metadata exists
         if "metadata" not in design_schema:
             design_schema["metadata"] = {}
 
         # Try to detect WordPress theme name
-        theme_match = re.search(r'wp-content/themes/([^/]+)', html_content, re.IGNORECASE)
+        theme_match = _WP_THEME_RE.search(html_content)
         theme_name = theme_match.group(1) if theme_match else None
 
         design_schema["metadata"]["cms"] = {
@@ -1197,8 +1581,7 @@ class WordPressPlugin(DesignSchemeExtractorPlugin):
         # Look for common WordPress elements like sidebar widgets
         if driver:
             try:
-                sidebar = driver.find_elements("css selector", ".widget-area, .sidebar, #sidebar, #secondary")
-                visible_sidebar = next((s for s in sidebar if s.is_displayed()), None)
+                visible_sidebar = next(iter(find_visible_elements(driver, _WP_SIDEBAR_SELECTOR, limit=1)), None)
                 if visible_sidebar:
                      # Ensure components dict exists
                     if "components" not in design_schema:
@@ -1213,8 +1596,28 @@ class WordPressPlugin(DesignSchemeExtractorPlugin):
         return design_schema
 
 # Plugin registry
+_PLUGINS = []
+# Pipeline per website type: (plugin_name, bound enhance_schema) pairs in registration order,
+# so each page needs a single lookup and no per-plugin attribute access
+_PLUGINS_BY_TYPE = {}
+
+def register_plugin(plugin):
+    """
+    Register a plugin instance so it is applied to pages of its applicable types.
+
+    Args:
+        plugin: DesignSchemeExtractorPlugin instance
+
+    Returns:
+        The registered plugin, for convenience.
+    """
+    _PLUGINS.append(plugin)
+    for website_type in plugin.applicable_types:
+        _PLUGINS_BY_TYPE.setdefault(website_type, []).append((plugin.plugin_name, plugin.enhance_schema))
+    return plugin
+
 # Add more plugins here as needed (e.g., ShopifyPlugin, BootstrapPlugin)
-_PLUGINS = [WordPressPlugin()]
+register_plugin(WordPressPlugin())
 
 def get_plugins():
     """Returns a list of available plugin instances."""
@@ -1222,23 +1625,21 @@ def get_plugins():
 
 def enhance_with_plugins(design_schema, website_type, html_content, driver=None):
     """Apply all applicable plugins to enhance the design schema."""
-    print(f"Running enhancement plugins for website type: {website_type}")
-    plugins = get_plugins()
+    logger.info("Running enhancement plugins for website type: %s", website_type)
     applied_plugins = []
 
-    for plugin in plugins:
+    for plugin_name, enhance_schema in _PLUGINS_BY_TYPE.get(website_type, ()):
         try:
-            if plugin.applies_to(website_type):
-                design_schema = plugin.enhance_schema(design_schema, html_content, driver)
-                applied_plugins.append(plugin.plugin_name)
+            design_schema = enhance_schema(design_schema, html_content, driver)
+            applied_plugins.append(plugin_name)
         except Exception as e:
-            print(f"Error applying plugin {getattr(plugin, 'plugin_name', 'unknown')}: {e}")
+            print(f"Error applying plugin {plugin_name}: {e}")
             # Continue with other plugins even if one fails
 
     if applied_plugins:
-        print(f"Applied plugins: {', '.join(applied_plugins)}")
+        logger.info("Applied plugins: %s", ', '.join(applied_plugins))
     else:
-        print("No applicable plugins found or applied.")
+        logger.info("No applicable plugins found or applied.")
 
     return design_schema
 
@@ -1253,16 +1654,10 @@ def optimize_for_ai_consumption(design_schema):
         design_schema: The extracted design schema dictionary
 
     Returns:
-        dict: A *copy* of the design schema with an added 'ai_consumption' key,
-              or the original schema if optimization fails.
+        dict: A *copy* of the design schema with an added 'ai_consumption' key.
+              The copy is shallow: nested sections are shared with design_schema,
+              which is only read here and never modified.
     """
-    # Create a deep copy to avoid modifying the original schema
-    try:
-        ai_schema = json.loads(json.dumps(design_schema)) # Simple deep copy via JSON
-    except Exception as e:
-        print(f"Error deep copying schema for AI optimization: {e}")
-        return design_schema # Return original if copy fails
-
     # Initialize descriptions and prompt elements
     descriptions = {
         "overall_style": "",
@@ -1272,177 +1667,114 @@ def optimize_for_ai_consumption(design_schema):
         "component_styles": ""
     }
     prompt_elements = []
+    # Sections read both by the descriptions and by the final result, bound once
+    colors = design_schema.get("colors") or {}
+    palette = colors.get("palette") or []
+    images = design_schema.get("images") or {}
 
     # --- Generate Natural Language Descriptions ---
-    try:
-        # Overall Style Description
-        style_keywords = ai_schema.get("design_summary", {}).get("style_keywords", [])
-        if style_keywords:
-            if len(style_keywords) > 1:
-                style_desc = f"The website features a {', '.join(style_keywords[:-1])} and {style_keywords[-1]} design style."
-            elif len(style_keywords) == 1:
-                style_desc = f"The website features a {style_keywords[0]} design style."
-            else:
-                style_desc = "The website's overall design style is neutral or couldn't be easily categorized."
-            descriptions["overall_style"] = style_desc
-            prompt_elements.append(f"Design Style: {', '.join(style_keywords)}")
-
-        # Color Scheme Description
-        colors = ai_schema.get("colors", {})
-        primary = colors.get("primary_color")
-        secondary = colors.get("secondary_color")
-        accent = colors.get("accent_color")
-        bg = colors.get("background_color")
-        text_c = colors.get("text_color")
-        if primary and secondary and accent and bg and text_c:
-            descriptions["color_scheme"] = f"Key colors are Primary: {primary}, Secondary: {secondary}, Accent: {accent}, Background: {bg}, Text: {text_c}."
-            prompt_elements.append(f"Color Palette: Primary({primary}), Secondary({secondary}), Accent({accent}), Background({bg}), Text({text_c})")
-        elif colors.get("palette"):
-             descriptions["color_scheme"] = f"The main color palette includes: {', '.join(colors['palette'][:5])}..."
-             prompt_elements.append(f"Color Palette: {', '.join(colors['palette'][:5])}")
-
-
-        # Typography Description
-        typography = ai_schema.get("typography", {})
-        body_font = typography.get("body", {}).get("font_family", "default")
-        heading_font = body_font # Default to body font
-        if typography.get("headings"):
-             # Try H1, then H2, etc.
-            for h_tag in ['h1', 'h2', 'h3']:
-                if h_tag in typography["headings"]:
-                    heading_font = typography["headings"][h_tag].get("font_family", body_font)
-                    break
-
-        if heading_font.lower() == body_font.lower():
-            descriptions["typography"] = f"Typography primarily uses the '{body_font}' font family."
-            prompt_elements.append(f"Typography: Use '{body_font}' font.")
-        else:
-            descriptions["typography"] = f"Typography uses '{heading_font}' for headings and '{body_font}' for body text."
-            prompt_elements.append(f"Typography: Headings '{heading_font}', Body '{body_font}'.")
-
-        # Layout & Spacing Description
-        layout = ai_schema.get("layout", {})
-        spacing_units = layout.get("common_spacing_units", [])
-        layout_desc_parts = []
-        if layout.get("has_grid_system"): layout_desc_parts.append("grid-based layout")
-        if layout.get("container_width"): layout_desc_parts.append(f"contained width (around {layout['container_width']}px)")
-        else: layout_desc_parts.append("full-width layout")
-        if spacing_units:
-            layout_desc_parts.append(f"common spacing unit around {spacing_units[0]}")
-            prompt_elements.append(f"Spacing: Base unit ~{spacing_units[0]}.")
-
-        descriptions["layout_spacing"] = f"Layout is generally {', '.join(layout_desc_parts)}."
-
-
-        # Component Styles Description
-        components = ai_schema.get("components", {})
-        comp_desc_parts = []
-        if components.get("buttons"):
-            btn_radius = components["buttons"].get("border_radius", "0px")
-            btn_style = "rounded" if btn_radius and btn_radius != "0px" else "sharp-edged"
-            comp_desc_parts.append(f"{btn_style} buttons")
-        if components.get("cards"):
-            card_shadow = components["cards"].get("box_shadow")
-            card_style = "shadowed" if card_shadow else "flat"
-            comp_desc_parts.append(f"{card_style} cards/panels")
-        if ai_schema.get("images", {}).get("has_svg_icons"):
-            comp_desc_parts.append("uses SVG icons")
-        elif ai_schema.get("images", {}).get("has_icon_font"):
-             comp_desc_parts.append("uses icon fonts")
-
-        if comp_desc_parts:
-            descriptions["component_styles"] = f"Key component styles include: {', '.join(comp_desc_parts)}."
+    # Overall Style Description
+    style_keywords = (design_schema.get("design_summary") or {}).get("style_keywords", [])
+    if style_keywords:
+        if len(style_keywords) > 1:
+            style_desc = f"The website features a {', '.join(style_keywords[:-1])} and {style_keywords[-1]} design style."
+        elif len(style_keywords) == 1:
+            style_desc = f"The website features a {style_keywords[0]} design style."
         else:
-            descriptions["component_styles"] = "Specific component styles were not prominently detected."
-
-    except Exception as e:
-        print(f"Error generating AI descriptions: {e}")
-        # Continue even if description generation fails partially
-
-    # Add the generated info to the schema copy
-    ai_schema["ai_consumption"] = {
-        "natural_language_descriptions": descriptions,
-        "suggested_prompt_elements": prompt_elements,
-        "full_palette_hex": ai_schema.get("colors", {}).get("palette", []) # Include full palette for reference
-    }
+            style_desc = "The website's overall design style is neutral or couldn't be easily categorized."
+        descriptions["overall_style"] = style_desc
+        prompt_elements.append(f"Design Style: {', '.join(style_keywords)}")
+
+    # Color Scheme Description
+    primary = colors.get("primary_color")
+    secondary = colors.get("secondary_color")
+    accent = colors.get("accent_color")
+    bg = colors.get("background_color")
+    text_c = colors.get("text_color")
+    if primary and secondary and accent and bg and text_c:
+        descriptions["color_scheme"] = f"Key colors are Primary: {primary}, Secondary: {secondary}, Accent: {accent}, Background: {bg}, Text: {text_c}."
+        prompt_elements.append(f"Color Palette: Primary({primary}), Secondary({secondary}), Accent({accent}), Background({bg}), Text({text_c})")
+    elif palette:
+         descriptions["color_scheme"] = f"The main color palette includes: {', '.join(palette[:5])}..."
+         prompt_elements.append(f"Color Palette: {', '.join(palette[:5])}")
+
+
+    # Typography Description
+    typography = design_schema.get("typography") or {}
+    body_font = (typography.get("body") or {}).get("font_family", "default")
+    heading_font = _primary_heading_font(typography, body_font) # Default to body font
+
+    if heading_font.lower() == body_font.lower():
+        descriptions["typography"] = f"Typography primarily uses the '{body_font}' font family."
+        prompt_elements.append(f"Typography: Use '{body_font}' font.")
+    else:
+        descriptions["typography"] = f"Typography uses '{heading_font}' for headings and '{body_font}' for body text."
+        prompt_elements.append(f"Typography: Headings '{heading_font}', Body '{body_font}'.")
+
+    # Layout & Spacing Description
+    layout = design_schema.get("layout") or {}
+    spacing_units = layout.get("common_spacing_units", [])
+    layout_desc_parts = []
+    if layout.get("has_grid_system"): layout_desc_parts.append("grid-based layout")
+    if layout.get("container_width"): layout_desc_parts.append(f"contained width (around {layout['container_width']}px)")
+    else: layout_desc_parts.append("full-width layout")
+    if spacing_units:
+        layout_desc_parts.append(f"common spacing unit around {spacing_units[0]}")
+        prompt_elements.append(f"Spacing: Base unit ~{spacing_units[0]}.")
+
+    descriptions["layout_spacing"] = f"Layout is generally {', '.join(layout_desc_parts)}."
+
+
+    # Component Styles Description
+    components = design_schema.get("components") or {}
+    comp_desc_parts = []
+    if components.get("buttons"):
+        btn_radius = components["buttons"].get("border_radius", "0px")
+        btn_style = "rounded" if btn_radius and btn_radius != "0px" else "sharp-edged"
+        comp_desc_parts.append(f"{btn_style} buttons")
+    if components.get("cards"):
+        card_shadow = components["cards"].get("box_shadow")
+        card_style = "shadowed" if card_shadow else "flat"
+        comp_desc_parts.append(f"{card_style} cards/panels")
+    if images.get("has_svg_icons"):
+        comp_desc_parts.append("uses SVG icons")
+    elif images.get("has_icon_font"):
+         comp_desc_parts.append("uses icon fonts")
 
-    return ai_schema
+    if comp_desc_parts:
+        descriptions["component_styles"] = f"Key component styles include: {', '.join(comp_desc_parts)}."
+    else:
+        descriptions["component_styles"] = "Specific component styles were not prominently detected."
 
-def generate_design_code_snippets(design_schema):
-    """
-    Generate code snippets (CSS Variables, Tailwind Config, Styled Components Theme)
-    based on the extracted design schema.
+    # Return a top-level copy of the schema with the generated info added
+    return {
+        **design_schema,
+        "ai_consumption": {
+            "natural_language_descriptions": descriptions,
+            "suggested_prompt_elements": prompt_elements,
+            "full_palette_hex": palette # Include full palette for reference
+        }
+    }
 
-    Args:
-        design_schema: The extracted design schema dictionary
+# Code snippet templates for generate_design_code_snippets, parsed once at import time
 
-    Returns:
-        dict: Dictionary containing code snippets as strings, or None if generation fails.
-    """
-    try:
-        colors = design_schema.get("colors", {})
-        typography = design_schema.get("typography", {})
-        layout = design_schema.get("layout", {})
-        components = design_schema.get("components", {})
-
-        # --- Extract key values with fallbacks ---
-        primary = colors.get("primary_color", "#0000ff") # Default blue
-        secondary = colors.get("secondary_color", "#6c757d") # Default gray
-        accent = colors.get("accent_color", "#ffc107") # Default yellow/orange
-        background = colors.get("background_color", "#ffffff")
-        text_color = colors.get("text_color", "#000000")
-
-        body_info = typography.get("body", {})
-        body_font_raw = body_info.get("font_family", "sans-serif")
-        # Extract first font from stack for simplicity in configs
-        body_font = body_font_raw.split(',')[0].strip().strip('"\'')
-        body_size = body_info.get("font_size", "16px")
-
-        heading_font_raw = body_font_raw # Default to body font
-        if typography.get("headings"):
-            for h_tag in ['h1', 'h2', 'h3']:
-                if h_tag in typography["headings"]:
-                    heading_font_raw = typography["headings"][h_tag].get("font_family", body_font_raw)
-                    break
-        heading_font = heading_font_raw.split(',')[0].strip().strip('"\'')
-
-        spacing_unit_val = "8" # Default spacing unit value
-        spacing_units = layout.get("common_spacing_units", [])
-        if spacing_units:
-            # Try to parse the first common spacing unit
-            match = re.match(r'(\d+)', spacing_units[0])
-            if match:
-                spacing_unit_val = match.group(1)
-        spacing_unit = f"{spacing_unit_val}px"
-
-        border_radius_val = "4" # Default radius value
-        button_radius = components.get("buttons", {}).get("border_radius")
-        card_radius = components.get("cards", {}).get("border_radius")
-        # Prioritize button radius, then card radius
-        radius_to_use = button_radius or card_radius
-        if radius_to_use:
-             match = re.match(r'(\d+)', radius_to_use)
-             if match:
-                 border_radius_val = match.group(1)
-        border_radius = f"{border_radius_val}px"
-
-        # --- Generate CSS Variables ---
-        css_variables = f""":root {{
+# CSS Variables
+_CSS_VARIABLES_TPL = Template(""":root {
   /* Colors */
-  --color-primary: {primary};
-  --color-secondary: {secondary};
-  --color-accent: {accent};
-  --color-background: {background};
-  --color-text: {text_color};
+  --color-primary: ${primary};
+  --color-secondary: ${secondary};
+  --color-accent: ${accent};
+  --color-background: ${background};
+  --color-text: ${text_color};
 
   /* Typography */
-  --font-body: {body_font_raw};
-  --font-heading: {heading_font_raw};
-  --font-size-base: {body_size};
+  --font-body: ${body_font_raw};
+  --font-heading: ${heading_font_raw};
+  --font-size-base: ${body_size};
   /* Add more font sizes if extracted */
 
   /* Spacing */
-  --spacing-unit: {spacing_unit};
+  --spacing-unit: ${spacing_unit};
   --spacing-xs: calc(var(--spacing-unit) * 0.25);
   --spacing-sm: calc(var(--spacing-unit) * 0.5);
   --spacing-md: var(--spacing-unit);
@@ -1451,97 +1783,232 @@ def generate_design_code_snippets(design_schema):
   --spacing-xxl: calc(var(--spacing-unit) * 3);
 
   /* Borders */
-  --border-radius: {border_radius};
+  --border-radius: ${border_radius};
   /* Add border width/style if extracted */
-}}
-"""
-
-        # --- Generate Tailwind CSS config ---
-        # Note: Tailwind expects font names without quotes usually
-        tailwind_config = f"""
-// tailwind.config.js
-module.exports = {{
-  theme: {{
-    extend: {{
-      colors: {{
-        primary: '{primary}',
-        secondary: '{secondary}',
-        accent: '{accent}',
-        'surface-bg': '{background}', // Renamed for clarity
-        'text-main': '{text_color}',   // Renamed for clarity
-      }},
-      fontFamily: {{
+}""")
+
+# Tailwind CSS config
+# Note: Tailwind expects font names without quotes usually. "$$" is a literal "$" in the JS template literals
+_TAILWIND_CONFIG_TPL = Template("""// tailwind.config.js
+module.exports = {
+  theme: {
+    extend: {
+      colors: {
+        primary: '${primary}',
+        secondary: '${secondary}',
+        accent: '${accent}',
+        'surface-bg': '${background}', // Renamed for clarity
+        'text-main': '${text_color}',   // Renamed for clarity
+      },
+      fontFamily: {
         // Ensure font names are suitable for Tailwind config keys/values
-        sans: ['{body_font}', 'ui-sans-serif', 'system-ui'],
-        heading: ['{heading_font}', 'ui-serif', 'Georgia'], // Example fallback
-      }},
-      fontSize: {{
-         'base': '{body_size}',
+        sans: ['${body_font}', 'ui-sans-serif', 'system-ui'],
+        heading: ['${heading_font}', 'ui-serif', 'Georgia'], // Example fallback
+      },
+      fontSize: {
+         'base': '${body_size}',
          // Add other sizes if available, e.g., 'lg': '1.125rem'
-      }},
-      spacing: {{
-        'unit': '{spacing_unit}',
+      },
+      spacing: {
+        'unit': '${spacing_unit}',
         // Generate some multiples based on the unit
-        'xs': `calc(${{{spacing_unit_val}}}px * 0.25)`,
-        'sm': `calc(${{{spacing_unit_val}}}px * 0.5)`,
-        'md': '{spacing_unit}',
-        'lg': `calc(${{{spacing_unit_val}}}px * 1.5)`,
-        'xl': `calc(${{{spacing_unit_val}}}px * 2)`,
-        '2xl': `calc(${{{spacing_unit_val}}}px * 3)`,
-      }},
-      borderRadius: {{
-        DEFAULT: '{border_radius}',
+        'xs': `calc($${${spacing_unit_val}}px * 0.25)`,
+        'sm': `calc($${${spacing_unit_val}}px * 0.5)`,
+        'md': '${spacing_unit}',
+        'lg': `calc($${${spacing_unit_val}}px * 1.5)`,
+        'xl': `calc($${${spacing_unit_val}}px * 2)`,
+        '2xl': `calc($${${spacing_unit_val}}px * 3)`,
+      },
+      borderRadius: {
+        DEFAULT: '${border_radius}',
         // Add other radius sizes if needed, e.g., 'lg': '0.5rem'
-      }},
-    }},
-  }},
+      },
+    },
+  },
   plugins: [],
-}}
-"""
-
-        # --- Generate React styled-components theme ---
-        styled_components_theme = f"""
-// theme.js (for styled-components)
-const theme = {{
-  colors: {{
-    primary: '{primary}',
-    secondary: '{secondary}',
-    accent: '{accent}',
-    background: '{background}',
-    text: '{text_color}',
-  }},
-  fonts: {{
-    body: '{body_font_raw}', // Keep full font stack
-    heading: '{heading_font_raw}',
-  }},
-  fontSizes: {{
-    base: '{body_size}',
+}""")
+
+# React styled-components theme
+_STYLED_COMPONENTS_THEME_TPL = Template("""// theme.js (for styled-components)
+const theme = {
+  colors: {
+    primary: '${primary}',
+    secondary: '${secondary}',
+    accent: '${accent}',
+    background: '${background}',
+    text: '${text_color}',
+  },
+  fonts: {
+    body: '${body_font_raw}', // Keep full font stack
+    heading: '${heading_font_raw}',
+  },
+  fontSizes: {
+    base: '${body_size}',
     // Add more sizes if extracted, e.g., h1: '2rem'
-  }},
-  spacing: {{
-    unit: '{spacing_unit}',
-    xs: `calc({spacing_unit} * 0.25)`,
-    sm: `calc({spacing_unit} * 0.5)`,
-    md: '{spacing_unit}',
-    lg: `calc({spacing_unit} * 1.5)`,
-    xl: `calc({spacing_unit} * 2)`,
-    xxl: `calc({spacing_unit} * 3)`,
-  }},
-  borderRadius: '{border_radius}',
-}};
-
-export default theme;
-"""
+  },
+  spacing: {
+    unit: '${spacing_unit}',
+    xs: `calc(${spacing_unit} * 0.25)`,
+    sm: `calc(${spacing_unit} * 0.5)`,
+    md: '${spacing_unit}',
+    lg: `calc(${spacing_unit} * 1.5)`,
+    xl: `calc(${spacing_unit} * 2)`,
+    xxl: `calc(${spacing_unit} * 3)`,
+  },
+  borderRadius: '${border_radius}',
+};
+
+export default theme;""")
+
+def _leading_digits(value):
+    """Return the run of digits at the start of value (e.g. '16' for '16px'), or None if there is none."""
+    i = 0
+    n = len(value)
+    while i < n and value[i].isdecimal():
+        i += 1
+    return value[:i] if i else None
+
+def _first_font(stack):
+    """Return the first family of a CSS font stack without quotes, e.g. 'Inter' for '"Inter", sans-serif'."""
+    return stack.partition(',')[0].strip().strip('"\'')
 
-        return {
-            "css_variables": css_variables.strip(),
-            "tailwind_config": tailwind_config.strip(),
-            "styled_components_theme": styled_components_theme.strip()
-        }
+def generate_design_code_snippets(design_schema):
+    """
+    Generate code snippets (CSS Variables, Tailwind Config, Styled Components Theme)
+    based on the extracted design schema.
 
-    except Exception as e:
-        print(f"Error generating code snippets: {e}")
-        return None
+    Args:
+        design_schema: The extracted design schema dictionary
+
+    Returns:
+        dict: Dictionary containing code snippets as strings.
+    """
+    # Missing or null sections fall back to the defaults below
+    colors = design_schema.get("colors") or {}
+    typography = design_schema.get("typography") or {}
+    layout = design_schema.get("layout") or {}
+    components = design_schema.get("components") or {}
+
+    # --- Extract key values with fallbacks ---
+    primary = colors.get("primary_color", "#0000ff") # Default blue
+    secondary = colors.get("secondary_color", "#6c757d") # Default gray
+    accent = colors.get("accent_color", "#ffc107") # Default yellow/orange
+    background = colors.get("background_color", "#ffffff")
+    text_color = colors.get("text_color", "#000000")
+
+    body_info = typography.get("body") or {}
+    body_font_raw = body_info.get("font_family", "sans-serif")
+    body_size = body_info.get("font_size", "16px")
+
+    heading_font_raw = _primary_heading_font(typography, body_font_raw) # Default to body font
+
+    spacing_unit_val = "8" # Default spacing unit value
+    spacing_units = layout.get("common_spacing_units", [])
+    if spacing_units:
+        # Try to parse the first common spacing unit
+        lead = _leading_digits(spacing_units[0])
+        if lead:
+            spacing_unit_val = lead
+
+    border_radius_val = "4" # Default radius value
+    buttons = components.get("buttons") or {}
+    cards = components.get("cards") or {}
+    button_radius = buttons.get("border_radius")
+    card_radius = cards.get("border_radius")
+    # Prioritize button radius, then card radius
+    radius_to_use = button_radius or card_radius
+    if radius_to_use:
+         lead = _leading_digits(radius_to_use)
+         if lead:
+             border_radius_val = lead
+
+    css_variables, tailwind_config, styled_components_theme = _render_snippets(
+        primary, secondary, accent, background, text_color,
+        body_font_raw, heading_font_raw, body_size, spacing_unit_val, border_radius_val
+    )
+    return {
+        "css_variables": css_variables,
+        "tailwind_config": tailwind_config,
+        "styled_components_theme": styled_components_theme
+    }
+
+@lru_cache(maxsize=128)
+def _render_snippets(primary, secondary, accent, background, text_color,
+                     body_font_raw, heading_font_raw, body_size, spacing_unit_val, border_radius_val):
+    """
+    Fill in the CSS Variables, Tailwind CSS config and React styled-components theme templates.
+    Cached on the extracted values, so repeated identical design values (batch runs, retries)
+    cost a single lookup.
+
+    Returns:
+        tuple: (css_variables, tailwind_config, styled_components_theme) strings
+    """
+    # Extract first font from stack for simplicity in configs
+    body_font = _first_font(body_font_raw)
+    # Headings fall back to the body stack, so the common case needs no second parse
+    heading_font = body_font if heading_font_raw == body_font_raw else _first_font(heading_font_raw)
+    params = {
+        "primary": primary,
+        "secondary": secondary,
+        "accent": accent,
+        "background": background,
+        "text_color": text_color,
+        "body_font_raw": body_font_raw,
+        "body_font": body_font,
+        "heading_font_raw": heading_font_raw,
+        "heading_font": heading_font,
+        "body_size": body_size,
+        "spacing_unit_val": spacing_unit_val,
+        "spacing_unit": f"{spacing_unit_val}px",
+        "border_radius": f"{border_radius_val}px"
+    }
+    return (
+        _CSS_VARIABLES_TPL.substitute(params),
+        _TAILWIND_CONFIG_TPL.substitute(params),
+        _STYLED_COMPONENTS_THEME_TPL.substitute(params)
+    )
+
+# Line templates for generate_documentation (swatches use %-formatting as they are emitted per color).
+# Runs of fixed lines are kept together as one multi-line template per section.
+_DOC_HEADER_TPL = """# Design Scheme Documentation
+*Source URL: {source_url}*
+*Extraction Date: {extraction_date}*
+*Schema Version: {schema_version}*
+
+## Overall Style Summary"""
+_DOC_BODY_TEXT_TPL = """
+### Body Text
+- **Font Family:** `{font_family}`
+- **Font Size:** `{font_size}`
+- **Font Weight:** `{font_weight}`
+- **Line Height:** `{line_height}`"""
+_DOC_LAYOUT_TPL = """- **Page Dimensions (Approx):** Width: `{width}px`, Height: `{height}px`
+- **Container Width (Detected):** `{container_width}`
+- **Grid System Likely:** `{grid}`"""
+_DOC_IMAGES_TPL = """
+## Images & Icons
+- **SVG Icons Used:** `{svg_icons}`
+- **Icon Font Used:** `{icon_font}`"""
+_DOC_COLOR_ROLES = (
+    ("Primary", "primary_color"),
+    ("Secondary", "secondary_color"),
+    ("Accent", "accent_color"),
+    ("Background", "background_color"),
+    ("Text", "text_color"),
+)
+_DOC_COLOR_ROW_TPL = "| {role:<16} | {swatch}      | `{hex_code}`             |"
+_DOC_COLOR_SWATCH_TPL = '<div style="background-color: %s; width: 20px; height: 20px; display: inline-block; border: 1px solid #ccc; vertical-align: middle;"></div>'
+_DOC_PALETTE_SWATCH_TPL = '<div style="background-color: %s; width: 30px; height: 30px; display: inline-block; margin: 2px; border: 1px solid #ccc; vertical-align: middle;" title="%s"></div>'
+_DOC_PROPERTY_TPL = "- **{label}:** `{value}`"
+_DOC_HEADING_TPL = """#### `<{tag}>` Style
+  - **Font Family:** `{font_family}`
+  - **Font Size:** `{font_size}`
+  - **Font Weight:** `{font_weight}`"""
+
+@lru_cache(maxsize=256)
+def _pretty(name):
+    """Turn a schema property name into a documentation label, e.g. 'border_radius' -> 'Border Radius'."""
+    return name.replace('_', ' ').title()
 
 def generate_documentation(design_schema):
     """
@@ -1551,159 +2018,218 @@ def generate_documentation(design_schema):
         design_schema: The extracted design schema dictionary
 
     Returns:
-        str: Markdown documentation string, or an empty string if generation fails.
+        str: Markdown documentation string.
     """
-    try:
-        # Extract key sections for easier access
-        metadata = design_schema.get("metadata", {})
-        colors = design_schema.get("colors", {})
-        typography = design_schema.get("typography", {})
-        layout = design_schema.get("layout", {})
-        components = design_schema.get("components", {})
-        images = design_schema.get("images", {})
-        summary = design_schema.get("design_summary", {})
-        ai_info = design_schema.get("ai_consumption", {}).get("natural_language_descriptions", {}) # Get AI descriptions if available
-
-        # --- Header ---
-        doc_parts = [
-            f"# Design Scheme Documentation",
-            f"*Source URL: {metadata.get('source_url', 'N/A')}*",
-            f"*Extraction Date: {metadata.get('extraction_date', 'N/A')}*",
-            f"*Schema Version: {metadata.get('schema_version', 'N/A')}*",
-            f"\n## Overall Style Summary",
-            f"{ai_info.get('overall_style', ' '.join(summary.get('style_keywords', ['N/A'])))}", # Use AI desc or keywords
-        ]
-
-        # --- Color Palette ---
-        doc_parts.append("\n## Color Palette")
-        doc_parts.append(f"{ai_info.get('color_scheme', 'See details below.')}") # Use AI description if available
+    # Extract key sections for easier access (missing or null sections read as empty)
+    metadata = design_schema.get("metadata") or {}
+    colors = design_schema.get("colors") or {}
+    typography = design_schema.get("typography") or {}
+    layout = design_schema.get("layout") or {}
+    components = design_schema.get("components") or {}
+    images = design_schema.get("images") or {}
+    summary = design_schema.get("design_summary") or {}
+    ai_consumption = design_schema.get("ai_consumption") or {}
+    ai_info = ai_consumption.get("natural_language_descriptions") or {} # Get AI descriptions if available
+    # Component sub-sections, bound once for the checks and loops below
+    buttons = components.get("buttons") or {}
+    cards = components.get("cards") or {}
+    form_inputs = (components.get("forms") or {}).get("inputs") or {}
+    nav = components.get("navigation") or {}
+
+    # --- Header ---
+    doc_parts = [_DOC_HEADER_TPL.format(
+        source_url=metadata.get('source_url', 'N/A'),
+        extraction_date=metadata.get('extraction_date', 'N/A'),
+        schema_version=metadata.get('schema_version', 'N/A')
+    )]
+    # Only non-empty parts are appended, so the final join needs no filtering pass
+    def append_text(text):
+        if text:
+            doc_parts.append(str(text))
+
+    def append_properties(section):
+        doc_parts.extend(
+            _DOC_PROPERTY_TPL.format(label=_pretty(prop), value=value)
+            for prop, value in section.items() if value
+        )
+
+    append_text(ai_info.get('overall_style', ' '.join(summary.get('style_keywords', ['N/A'])))) # Use AI desc or keywords
+
+    # --- Color Palette ---
+    doc_parts.append("\n## Color Palette")
+    append_text(ai_info.get('color_scheme', 'See details below.')) # Use AI description if available
+    # Rows are only built for the roles that have a color; the table is skipped when none do
+    role_colors = [(role, colors[key]) for role, key in _DOC_COLOR_ROLES if colors.get(key)]
+    if role_colors:
         doc_parts.append("\n| Role             | Color Preview | Hex Code                 |")
         doc_parts.append(  "|------------------|---------------|--------------------------|")
-
-        def color_row(role, hex_code):
-            if not hex_code: return ""
+        doc_parts.extend(
             # Simple inline style for color swatch
-            swatch = f'<div style="background-color: {hex_code}; width: 20px; height: 20px; display: inline-block; border: 1px solid #ccc; vertical-align: middle;"></div>'
-            return f"| {role.ljust(16)} | {swatch}      | `{hex_code}`             |"
-
-        doc_parts.append(color_row("Primary", colors.get("primary_color")))
-        doc_parts.append(color_row("Secondary", colors.get("secondary_color")))
-        doc_parts.append(color_row("Accent", colors.get("accent_color")))
-        doc_parts.append(color_row("Background", colors.get("background_color")))
-        doc_parts.append(color_row("Text", colors.get("text_color")))
-
-        palette = colors.get("palette", [])
-        if palette:
-            doc_parts.append("\n### Full Palette Detected")
-            palette_swatches = " ".join([
-                f'<div style="background-color: {color}; width: 30px; height: 30px; display: inline-block; margin: 2px; border: 1px solid #ccc; vertical-align: middle;" title="{color}"></div>'
-                for color in palette
-            ])
-            doc_parts.append(palette_swatches)
-
-        # --- Typography ---
-        doc_parts.append("\n## Typography")
-        doc_parts.append(f"{ai_info.get('typography', 'See details below.')}") # Use AI description if available
-        body_info = typography.get("body", {})
-        doc_parts.append("\n### Body Text")
-        doc_parts.append(f"- **Font Family:** `{body_info.get('font_family', 'N/A')}`")
-        doc_parts.append(f"- **Font Size:** `{body_info.get('font_size', 'N/A')}`")
-        doc_parts.append(f"- **Font Weight:** `{body_info.get('font_weight', 'N/A')}`")
-        doc_parts.append(f"- **Line Height:** `{body_info.get('line_height', 'N/A')}`")
-
-        headings = typography.get("headings", {})
-        if headings:
-            doc_parts.append("\n### Headings")
-            for tag, styles in sorted(headings.items()):
-                doc_parts.append(f"#### `<{tag}>` Style")
-                doc_parts.append(f"  - **Font Family:** `{styles.get('font_family', 'N/A')}`")
-                doc_parts.append(f"  - **Font Size:** `{styles.get('font_size', 'N/A')}`")
-                doc_parts.append(f"  - **Font Weight:** `{styles.get('font_weight', 'N/A')}`")
-
-        font_imports = typography.get("font_imports", [])
-        if font_imports:
-             doc_parts.append("\n### Font Imports Detected")
-             for imp in font_imports:
-                 doc_parts.append(f"- `{imp}`")
-        if typography.get("custom_fonts_detected"):
-            doc_parts.append("- Custom fonts (`@font-face`) detected in CSS.")
-
-
-        # --- Layout & Spacing ---
-        doc_parts.append("\n## Layout & Spacing")
-        doc_parts.append(f"{ai_info.get('layout_spacing', 'See details below.')}") # Use AI description if available
-        page_dims = layout.get("page_dimensions", {})
-        doc_parts.append(f"- **Page Dimensions (Approx):** Width: `{page_dims.get('width', 'N/A')}px`, Height: `{page_dims.get('height', 'N/A')}px`")
-        doc_parts.append(f"- **Container Width (Detected):** `{layout.get('container_width', 'N/A') or 'Full Width'}`")
-        doc_parts.append(f"- **Grid System Likely:** `{'Yes' if layout.get('has_grid_system') else 'No'}`")
-        spacing = layout.get("common_spacing_units", [])
-        if spacing:
-            doc_parts.append(f"- **Common Spacing Units:** `{', '.join(spacing)}`")
-
-        # --- Components ---
-        doc_parts.append("\n## Component Styles (Sampled)")
-        doc_parts.append(f"{ai_info.get('component_styles', 'See details below.')}") # Use AI description if available
-
-        if components.get("buttons"):
-            doc_parts.append("\n### Buttons")
-            for prop, value in components["buttons"].items():
-                if value: doc_parts.append(f"- **{prop.replace('_', ' ').title()}:** `{value}`")
-        if components.get("cards"):
-            doc_parts.append("\n### Cards / Panels")
-            for prop, value in components["cards"].items():
-                 if value: doc_parts.append(f"- **{prop.replace('_', ' ').title()}:** `{value}`")
-        if components.get("forms", {}).get("inputs"):
-             doc_parts.append("\n### Form Inputs")
-             for prop, value in components["forms"]["inputs"].items():
-                 if value: doc_parts.append(f"- **{prop.replace('_', ' ').title()}:** `{value}`")
-        if components.get("navigation"):
-             doc_parts.append("\n### Navigation / Header")
-             for prop, value in components["navigation"].items():
-                 if value: doc_parts.append(f"- **{prop.replace('_', ' ').title()}:** `{value}`")
-
-        css_patterns = components.get("detected_css_patterns", [])
-        if css_patterns:
-            doc_parts.append("\n### Detected CSS Class Patterns")
-            doc_parts.append(f"`{', '.join(css_patterns)}`")
-
-        # --- Images & Icons ---
-        doc_parts.append("\n## Images & Icons")
-        doc_parts.append(f"- **SVG Icons Used:** `{'Yes' if images.get('has_svg_icons') else 'No'}`")
-        doc_parts.append(f"- **Icon Font Used:** `{'Yes' if images.get('has_icon_font') else 'No'}`")
-        icon_classes = images.get("icon_classes_found", [])
-        if icon_classes:
-            doc_parts.append(f"- **Detected Icon Classes:** `{', '.join(icon_classes)}`")
-
-        image_style = images.get("image_style", {})
-        if any(image_style.values()): # Check if any style was detected
-            doc_parts.append("\n### Image Styling (Sampled)")
-            for prop, value in image_style.items():
-                if value: doc_parts.append(f"- **{prop.replace('_', ' ').title()}:** `{value}`")
-
-        doc_parts.append(f"\n- **Logo Detected:** `{'Yes' if images.get('logo_detected') else 'No'}`")
-        if images.get("logo_url"):
-             doc_parts.append(f"- **Logo URL:** `{images.get('logo_url')}`")
-
-
-        # --- AI Integration Guide (Optional) ---
-        if ai_info:
-            doc_parts.append("\n## AI Integration Guide")
-            prompt_elements = design_schema.get("ai_consumption", {}).get("suggested_prompt_elements", [])
-            if prompt_elements:
-                 doc_parts.append("Key elements for AI prompts:")
-                 for i, element in enumerate(prompt_elements):
-                      doc_parts.append(f"{i+1}. {element}")
-
-        return "\n".join(filter(None, doc_parts)) # Join non-empty parts
+            _DOC_COLOR_ROW_TPL.format(role=role, swatch=_DOC_COLOR_SWATCH_TPL % hex_code, hex_code=hex_code)
+            for role, hex_code in role_colors
+        )
+    else:
+        doc_parts.append("\n_No colors detected._")
+
+    palette = colors.get("palette", [])
+    if palette:
+        doc_parts.append("\n### Full Palette Detected")
+        doc_parts.append(" ".join(_DOC_PALETTE_SWATCH_TPL % (color, color) for color in palette))
+
+    # --- Typography ---
+    doc_parts.append("\n## Typography")
+    append_text(ai_info.get('typography', 'See details below.')) # Use AI description if available
+    body_info = typography.get("body") or {}
+    doc_parts.append(_DOC_BODY_TEXT_TPL.format(
+        font_family=body_info.get('font_family', 'N/A'),
+        font_size=body_info.get('font_size', 'N/A'),
+        font_weight=body_info.get('font_weight', 'N/A'),
+        line_height=body_info.get('line_height', 'N/A')
+    ))
+
+    headings = typography.get("headings", {})
+    if headings:
+        doc_parts.append("\n### Headings")
+        for tag in _HEADING_TAGS:
+            styles = headings.get(tag)
+            if not styles:
+                continue
+            doc_parts.append(_DOC_HEADING_TPL.format(
+                tag=tag,
+                font_family=styles.get('font_family', 'N/A'),
+                font_size=styles.get('font_size', 'N/A'),
+                font_weight=styles.get('font_weight', 'N/A')
+            ))
+
+    font_imports = typography.get("font_imports", [])
+    if font_imports:
+         doc_parts.append("\n### Font Imports Detected")
+         for imp in font_imports:
+             doc_parts.append(f"- `{imp}`")
+    if typography.get("custom_fonts_detected"):
+        doc_parts.append("- Custom fonts (`@font-face`) detected in CSS.")
+
+
+    # --- Layout & Spacing ---
+    doc_parts.append("\n## Layout & Spacing")
+    append_text(ai_info.get('layout_spacing', 'See details below.')) # Use AI description if available
+    page_dims = layout.get("page_dimensions") or {}
+    doc_parts.append(_DOC_LAYOUT_TPL.format(
+        width=page_dims.get('width', 'N/A'),
+        height=page_dims.get('height', 'N/A'),
+        container_width=layout.get('container_width', 'N/A') or 'Full Width',
+        grid='Yes' if layout.get('has_grid_system') else 'No'
+    ))
+    spacing = layout.get("common_spacing_units", [])
+    if spacing:
+        doc_parts.append(f"- **Common Spacing Units:** `{', '.join(spacing)}`")
+
+    # --- Components ---
+    doc_parts.append("\n## Component Styles (Sampled)")
+    append_text(ai_info.get('component_styles', 'See details below.')) # Use AI description if available
+
+    if buttons:
+        doc_parts.append("\n### Buttons")
+        append_properties(buttons)
+    if cards:
+        doc_parts.append("\n### Cards / Panels")
+        append_properties(cards)
+    if form_inputs:
+         doc_parts.append("\n### Form Inputs")
+         append_properties(form_inputs)
+    if nav:
+         doc_parts.append("\n### Navigation / Header")
+         append_properties(nav)
+
+    css_patterns = components.get("detected_css_patterns", [])
+    if css_patterns:
+        doc_parts.append("\n### Detected CSS Class Patterns")
+        doc_parts.append(f"`{', '.join(css_patterns)}`")
+
+    # --- Images & Icons ---
+    doc_parts.append(_DOC_IMAGES_TPL.format(
+        svg_icons='Yes' if images.get('has_svg_icons') else 'No',
+        icon_font='Yes' if images.get('has_icon_font') else 'No'
+    ))
+    icon_classes = images.get("icon_classes_found", [])
+    if icon_classes:
+        doc_parts.append(f"- **Detected Icon Classes:** `{', '.join(icon_classes)}`")
+
+    image_style = images.get("image_style") or {}
+    if any(image_style.values()): # Check if any style was detected
+        doc_parts.append("\n### Image Styling (Sampled)")
+        append_properties(image_style)
+
+    doc_parts.append(f"\n- **Logo Detected:** `{'Yes' if images.get('logo_detected') else 'No'}`")
+    logo_url = images.get("logo_url")
+    if logo_url:
+         doc_parts.append(f"- **Logo URL:** `{logo_url}`")
+
+
+    # --- AI Integration Guide (Optional) ---
+    if ai_info:
+        doc_parts.append("\n## AI Integration Guide")
+        prompt_elements = ai_consumption.get("suggested_prompt_elements", [])
+        if prompt_elements:
+             doc_parts.append("Key elements for AI prompts:")
+             for i, element in enumerate(prompt_elements):
+                  doc_parts.append(f"{i+1}. {element}")
+
+    return "\n".join(doc_parts)
 
+
+# --- Main Orchestration Function ---
+
+def _prepare_output_dir(output_file):
+    """Ensure the directory of the output file exists (create if necessary)."""
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+def _dumps_json(data):
+    """Encode data as indented UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _save_json(path, data, label):
+    """Write data as indented JSON to path. Returns True if the file was saved."""
+    try:
+        Path(path).write_bytes(_dumps_json(data))
+        logger.info("-> Saved %s to: %s", label, path)
+        return True
     except Exception as e:
-        print(f"Error generating documentation: {e}")
-        return "" # Return empty string on failure
+        print(f"Error saving {label} JSON: {e}")
+        return False
 
+def _save_text(path, text, label):
+    """Write a text artifact to path as UTF-8. Returns True if the file was saved."""
+    try:
+        # Encoded up front and written in one call, without a text-mode file wrapper
+        Path(path).write_bytes(text.encode('utf-8'))
+        logger.info("-> Saved %s to: %s", label, path)
+        return True
+    except Exception as e:
+        print(f"Error saving {label}: {e}")
+        return False
 
-# --- Main Orchestration Function ---
+# File extension for each snippet returned by generate_design_code_snippets
+_SNIPPET_EXT = {
+    "css_variables": ".css",
+    "tailwind_config": ".js", # Tailwind config is JS
+    "styled_components_theme": ".js" # Styled components theme is JS
+}
+
+def _save_snippets(snippets_dir, code_snippets):
+    """Write each code snippet to its own file in snippets_dir."""
+    os.makedirs(snippets_dir, exist_ok=True)
+
+    for name, snippet in code_snippets.items():
+        ext = _SNIPPET_EXT.get(name, ".txt") # Default extension for unknown snippet types
+        snippet_file = os.path.join(snippets_dir, f"{name}{ext}")
+        _save_text(snippet_file, snippet, f"code snippet '{name}'")
 
-def extract_design_scheme_extended(url, output_file=None, generate_docs=True, optimize_ai=True, generate_code=True):
+def extract_design_scheme_extended(url, output_file=None, generate_docs=True, optimize_ai=True, generate_code=True, driver=None, block_assets=False, stream_to_disk=False, parallel=True):
     """
     Extended version of the main function to extract a design scheme from a URL.
     Orchestrates fetching, analysis, schema generation, validation, and output generation.
@@ -1715,6 +2241,16 @@ def extract_design_scheme_extended(url, output_file=None, generate_docs=True, op
         generate_docs (bool): Whether to generate markdown documentation. Defaults to True.
         optimize_ai (bool): Whether to create the AI-optimized version of the schema. Defaults to True.
         generate_code (bool): Whether to generate code snippets. Defaults to True.
+        driver (optional): Existing Selenium webdriver to reuse. It is left open when extraction
+                           finishes; otherwise a driver is created and closed per call.
+        block_assets (bool): Block images, fonts and media in the driver created for this call
+                             (see create_driver). Ignored when a driver is provided. Defaults to False.
+        stream_to_disk (bool): With output_file, write the AI schema, documentation and code snippets
+                               as soon as each is generated and keep only their file paths in the
+                               results, instead of holding every artifact in memory. Defaults to False.
+        parallel (bool): Compute the screenshot colors on a worker thread while the driver-bound
+                         extractors run. The driver itself is only used from the calling thread.
+                         Defaults to True.
 
     Returns:
         dict: A dictionary containing the results:
@@ -1722,7 +2258,8 @@ def extract_design_scheme_extended(url, output_file=None, generate_docs=True, op
               - "ai_optimized_schema": Schema optimized for AI (dict, if optimize_ai is True).
               - "documentation": Markdown documentation (str, if generate_docs is True).
               - "code_snippets": Dictionary of code snippets (dict, if generate_code is True).
-              Returns None for keys if generation is skipped or fails.
+              Returns None for keys if generation is skipped or fails. When streaming to disk,
+              the last three hold the saved file path (snippets: the snippets directory) instead.
     """
     results = {
         "design_schema": None,
@@ -1730,137 +2267,125 @@ def extract_design_scheme_extended(url, output_file=None, generate_docs=True, op
         "documentation": None,
         "code_snippets": None
     }
-    driver = None # Initialize driver to None for finally block
+    owns_driver = driver is None # Only close drivers created for this call in the finally block
 
     try:
-        print(f"Starting design scheme extraction for: {url}")
+        logger.info("Starting design scheme extraction for: %s", url)
 
         # Step 1: Fetch the webpage content, screenshot, and driver
-        print("Fetching webpage content...")
-        html_content, screenshot, driver = fetch_webpage(url)
-        print("Webpage content fetched.")
+        logger.info("Fetching webpage content...")
+        html_content, screenshot, driver = fetch_webpage(url, driver, block_assets=block_assets)
+        # Relative links resolve against the document URL after any redirects
+        try:
+            page_url = driver.current_url or url
+        except Exception:
+            page_url = url
+        page = PageContext.from_html(page_url, html_content)
+        logger.info("Webpage content fetched.")
 
         # Step 2: Determine website type for potential plugin application
-        print("Determining website type...")
-        website_type = determine_website_type(html_content, url)
-        print(f"Detected website type: {website_type}")
+        logger.info("Determining website type...")
+        website_type = determine_website_type(page)
+        logger.info("Detected website type: %s", website_type)
 
         # Step 3: Extract individual design components
-        print("Extracting color palette...")
-        colors = extract_color_palette(screenshot, driver, html_content)
-        print("Extracting typography...")
-        typography = extract_typography(driver, html_content)
-        print("Analyzing layout and spacing...")
-        layout = analyze_layout(driver)
-        print("Detecting component patterns...")
-        components = detect_component_patterns(driver, html_content)
-        print("Analyzing images and icons...")
-        images = analyze_images_and_icons(driver, html_content)
-        print("Core design elements extracted.")
+        # The screenshot pixel work is submitted first so it overlaps the Selenium calls below
+        executor = ThreadPoolExecutor(max_workers=1) if parallel else None
+        try:
+            screenshot_future = executor.submit(extract_screenshot_colors, screenshot) if executor else None
+            logger.info("Extracting typography...")
+            typography = extract_typography(driver, page)
+            logger.info("Analyzing layout and spacing...")
+            layout = analyze_layout(driver)
+            logger.info("Detecting component patterns...")
+            components = detect_component_patterns(driver, page)
+            logger.info("Analyzing images and icons...")
+            images = analyze_images_and_icons(driver, page)
+            logger.info("Extracting color palette...")
+            screenshot_colors = screenshot_future.result() if screenshot_future else None
+            colors = extract_color_palette(screenshot, driver, page, screenshot_colors)
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+        logger.info("Core design elements extracted.")
 
         # Step 4: Generate the base design schema
-        print("Generating base design schema...")
+        logger.info("Generating base design schema...")
         design_schema = generate_design_schema(url, colors, typography, layout, components, images)
         results["design_schema"] = design_schema # Store base schema immediately
-        print("Base schema generated.")
+        logger.info("Base schema generated.")
 
         # Step 5: Enhance schema with plugins based on website type
-        print("Applying enhancement plugins...")
+        logger.info("Applying enhancement plugins...")
         design_schema = enhance_with_plugins(design_schema, website_type, html_content, driver)
         results["design_schema"] = design_schema # Update schema after plugins
-        print("Plugins applied.")
+        logger.info("Plugins applied.")
 
         # Step 6: Validate the final base schema
-        print("Validating generated schema...")
+        logger.info("Validating generated schema...")
         if not validate_schema(design_schema):
-            print("Warning: Generated schema did not pass validation. Output may be incomplete or incorrect.")
+            logger.warning("Generated schema did not pass validation. Output may be incomplete or incorrect.")
         else:
-            print("Schema validation passed.")
+            logger.info("Schema validation passed.")
+
+        # Output paths: related files are saved alongside output_file using its base name
+        stream = bool(output_file) and stream_to_disk
+        if output_file:
+            logger.info("Saving results to files based on prefix: %s", output_file)
+            _prepare_output_dir(output_file)
+            base_name, _ = os.path.splitext(output_file) # Use base name for related files
+            ai_file = f"{base_name}_ai.json"
+            doc_file = f"{base_name}_docs.md"
+            snippets_dir = f"{base_name}_snippets"
+            # Save main schema (JSON) before the derived artifacts, so an error while
+            # generating those cannot lose it
+            _save_json(output_file, design_schema, "base design scheme")
 
         # Step 7: Generate AI-optimized version (optional)
         if optimize_ai:
-            print("Optimizing schema for AI consumption...")
+            logger.info("Optimizing schema for AI consumption...")
             ai_schema = optimize_for_ai_consumption(design_schema)
             results["ai_optimized_schema"] = ai_schema
-            print("AI optimization complete.")
+            if stream and ai_schema and _save_json(ai_file, ai_schema, "AI-optimized schema"):
+                results["ai_optimized_schema"] = ai_file
+            logger.info("AI optimization complete.")
 
         # Step 8: Generate code snippets (optional)
         if generate_code:
-            print("Generating code snippets...")
+            logger.info("Generating code snippets...")
             code_snippets = generate_design_code_snippets(design_schema)
             results["code_snippets"] = code_snippets
-            print("Code snippets generated.")
+            if stream and code_snippets:
+                _save_snippets(snippets_dir, code_snippets)
+                results["code_snippets"] = snippets_dir
+            logger.info("Code snippets generated.")
 
         # Step 9: Generate documentation (optional)
         if generate_docs:
-            print("Generating documentation...")
+            logger.info("Generating documentation...")
             documentation = generate_documentation(design_schema)
             results["documentation"] = documentation
-            print("Documentation generated.")
+            if stream and documentation and _save_text(doc_file, documentation, "documentation"):
+                results["documentation"] = doc_file
+            logger.info("Documentation generated.")
 
-        # Step 10: Output results to files if output_file path is provided
+        # Step 10: Output the remaining results to files if output_file path is provided
         if output_file:
-            print(f"Saving results to files based on prefix: {output_file}")
-            # Ensure output directory exists (create if necessary)
-            output_dir = os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-                print(f"Created output directory: {output_dir}")
-
-            base_name, _ = os.path.splitext(output_file) # Use base name for related files
+            if not stream:
+                # Save AI-optimized schema (JSON)
+                if optimize_ai and results["ai_optimized_schema"]:
+                    _save_json(ai_file, results["ai_optimized_schema"], "AI-optimized schema")
 
-            # Save main schema (JSON)
-            try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(design_schema, f, indent=2, ensure_ascii=False)
-                print(f"-> Base design scheme saved to: {output_file}")
-            except Exception as e:
-                 print(f"Error saving base schema JSON: {e}")
+                # Save documentation (Markdown)
+                if generate_docs and results["documentation"]:
+                    _save_text(doc_file, results["documentation"], "documentation")
 
-            # Save AI-optimized schema (JSON)
-            if optimize_ai and results["ai_optimized_schema"]:
-                ai_file = f"{base_name}_ai.json"
-                try:
-                    with open(ai_file, 'w', encoding='utf-8') as f:
-                        json.dump(results["ai_optimized_schema"], f, indent=2, ensure_ascii=False)
-                    print(f"-> AI-optimized schema saved to: {ai_file}")
-                except Exception as e:
-                    print(f"Error saving AI schema JSON: {e}")
+                # Save code snippets
+                if generate_code and results["code_snippets"]:
+                    _save_snippets(snippets_dir, results["code_snippets"])
+            logger.info("File saving process complete.")
 
-            # Save documentation (Markdown)
-            if generate_docs and results["documentation"]:
-                doc_file = f"{base_name}_docs.md"
-                try:
-                    with open(doc_file, 'w', encoding='utf-8') as f:
-                        f.write(results["documentation"])
-                    print(f"-> Documentation saved to: {doc_file}")
-                except Exception as e:
-                    print(f"Error saving documentation: {e}")
-
-            # Save code snippets
-            if generate_code and results["code_snippets"]:
-                snippets_dir = f"{base_name}_snippets"
-                if not os.path.exists(snippets_dir):
-                    os.makedirs(snippets_dir)
-                    print(f"Created snippets directory: {snippets_dir}")
-
-                for name, snippet in results["code_snippets"].items():
-                    # Determine file extension based on snippet type
-                    if "css" in name: ext = ".css"
-                    elif "tailwind" in name: ext = ".js" # Tailwind config is JS
-                    elif "styled" in name: ext = ".js" # Styled components theme is JS
-                    else: ext = ".txt" # Default extension
-
-                    snippet_file = os.path.join(snippets_dir, f"{name}{ext}")
-                    try:
-                        with open(snippet_file, 'w', encoding='utf-8') as f:
-                            f.write(snippet)
-                        print(f"-> Code snippet '{name}' saved to: {snippet_file}")
-                    except Exception as e:
-                        print(f"Error saving snippet {name}: {e}")
-            print("File saving process complete.")
-
-        print("Design scheme extraction finished successfully.")
+        logger.info("Design scheme extraction finished successfully.")
         return results
 
     except Exception as e:
@@ -1874,16 +2399,138 @@ def extract_design_scheme_extended(url, output_file=None, generate_docs=True, op
         return results
 
     finally:
-        # Ensure the WebDriver is always closed
-        if driver:
-            print("Closing WebDriver...")
+        # Ensure the WebDriver is always closed (unless it belongs to the caller)
+        if driver and owns_driver:
+            logger.info("Closing WebDriver...")
             try:
                 driver.quit()
-                print("WebDriver closed.")
+                logger.info("WebDriver closed.")
             except Exception as e:
                 print(f"Error closing WebDriver: {e}")
 
 
+# --- Batch Processing ---
+
+# WebDriver owned by the current batch worker process. Selenium drivers are not
+# thread-safe, so parallelism comes from processes, each with its own Chrome instance.
+_worker_driver = None
+_worker_block_assets = False
+
+def _init_batch_worker(block_assets=False, log_level=None):
+    """Pool initializer: remember the driver options and set up logging for this worker process."""
+    global _worker_block_assets
+    # Spawned workers (the default on macOS/Windows) do not inherit the parent's logging setup
+    if log_level is not None:
+        logging.basicConfig(level=log_level, format='%(message)s')
+    # The driver itself is created on the first task (see _process_batch_url). An initializer
+    # that raises makes the pool respawn workers forever, so it must not start Chrome.
+    _worker_block_assets = block_assets
+
+def _process_batch_url(task):
+    """Run the extraction pipeline for one URL using the worker's driver (started on first use)."""
+    global _worker_driver
+    url, output_file, options = task
+    if _worker_driver is None:
+        try:
+            _worker_driver = create_driver(_worker_block_assets)
+        except Exception as e:
+            print(f"Error starting WebDriver for {url}: {e}")
+            return url, None
+        # Quit Chrome when the worker exits normally (after pool.close()/join())
+        multiprocessing.util.Finalize(_worker_driver, _worker_driver.quit, exitpriority=10)
+    return url, extract_design_scheme_extended(url, output_file, driver=_worker_driver, **options)
+
+def _url_slug(url):
+    """File-name-safe slug of a URL's host, path and query string."""
+    parsed = urlparse(url)
+    return _SLUG_SEPARATOR_RE.sub('-', f"{parsed.netloc}{parsed.path}?{parsed.query}").strip('-') or "page"
+
+def _output_files_for_urls(output_prefix, urls):
+    """
+    Derive a per-URL output file path from a shared output prefix (its extension is dropped).
+
+    URLs whose slugs collide (e.g. 'https://a.com' and 'https://a.com/') get a short hash
+    of the full URL appended, so no two URLs write the same files.
+
+    Returns:
+        dict: Maps each URL to its output file path
+    """
+    base_name, _ = os.path.splitext(output_prefix)
+    slugs = {url: _url_slug(url) for url in urls}
+    # Compared case-insensitively, as on the default macOS and Windows file systems
+    slug_counts = Counter(slug.lower() for slug in slugs.values())
+    output_files = {}
+    for url, slug in slugs.items():
+        if slug_counts[slug.lower()] > 1:
+            slug = f"{slug}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+        output_files[url] = f"{base_name}_{slug}.json"
+    return output_files
+
+def extract_design_schemes_batch(urls, output_prefix=None, workers=None, generate_docs=True, optimize_ai=True, generate_code=True, block_assets=False, stream_to_disk=False):
+    """
+    Extract design schemes for several URLs in parallel using a pool of worker processes.
+    Each worker owns a single Chrome instance that is reused for all URLs it processes.
+
+    Args:
+        urls (list): The URLs to analyze. Repeated URLs are only analyzed once.
+        output_prefix (str, optional): Output path prefix. Each URL is saved to
+                                       '<prefix>_<url-slug>.json' plus the usual related files;
+                                       an extension on the prefix ('out/site.json') is dropped first.
+                                       URLs with the same slug get a short hash of the URL appended.
+        workers (int, optional): Number of worker processes. Defaults to min(len(urls), CPU count).
+        generate_docs (bool): Whether to generate markdown documentation. Defaults to True.
+        optimize_ai (bool): Whether to create the AI-optimized version of the schema. Defaults to True.
+        generate_code (bool): Whether to generate code snippets. Defaults to True.
+        block_assets (bool): Block images, fonts and media in every worker's browser
+                             (see create_driver). Defaults to False.
+        stream_to_disk (bool): Write each URL's artifacts as soon as they are generated and return
+                               their file paths (see extract_design_scheme_extended). Defaults to False.
+
+    Returns:
+        dict: Maps each URL to its result dictionary from extract_design_scheme_extended,
+              or to None if no browser could be started for it.
+    """
+    options = {
+        "generate_docs": generate_docs,
+        "optimize_ai": optimize_ai,
+        "generate_code": generate_code,
+        "stream_to_disk": stream_to_disk
+    }
+    urls = list(dict.fromkeys(urls)) # Results are keyed by URL, so each URL is analyzed once
+    if not urls:
+        return {}
+    # Output paths are assigned up front, so concurrent workers never share files
+    output_files = _output_files_for_urls(output_prefix, urls) if output_prefix else {}
+    tasks = [(url, output_files.get(url), options) for url in urls]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+    all_results = {}
+    if workers == 1:
+        # No pool needed: process the URLs here, reusing a single driver for all of them
+        try:
+            driver = create_driver(block_assets)
+        except Exception as e:
+            print(f"Error starting WebDriver: {e}")
+            return {url: None for url, _, _ in tasks}
+        try:
+            for url, output_file, url_options in tasks:
+                all_results[url] = extract_design_scheme_extended(url, output_file, driver=driver, **url_options)
+        finally:
+            driver.quit()
+        return all_results
+
+    _chromedriver_path() # Resolve the driver once here so forked workers inherit the cached path
+    pool = multiprocessing.Pool(workers, initializer=_init_batch_worker, initargs=(block_assets, logger.getEffectiveLevel()))
+    try:
+        for url, results in pool.imap_unordered(_process_batch_url, tasks):
+            all_results[url] = results
+    finally:
+        # close()/join() rather than terminate() so each worker can quit its Chrome instance
+        pool.close()
+        pool.join()
+    return all_results
+
+
 # --- Command-Line Interface ---
 
 def main_extended():
@@ -1891,10 +2538,16 @@ def main_extended():
     parser = argparse.ArgumentParser(
         description='Extract web page design schemes (colors, typography, layout, etc.) for AI analysis and code generation.'
     )
-    parser.add_argument('url', help='URL of the webpage to analyze')
+    parser.add_argument('url', nargs='+', help='URL(s) of the webpage(s) to analyze')
     parser.add_argument(
         '-o', '--output',
-        help='Output file path prefix. Saves schema JSON here, and related files (docs, snippets) alongside with suffixes.'
+        help='Output file path prefix. Saves schema JSON here, and related files (docs, snippets) alongside with suffixes. '
+             'With several URLs, each URL is saved as <prefix>_<url-slug>.json.'
+    )
+    parser.add_argument(
+        '-j', '--workers', type=int, default=None,
+        help='Number of parallel worker processes (each with its own browser) when analyzing several URLs '
+             '(default: number of CPUs).'
     )
     parser.add_argument(
         '-p', '--pretty', action='store_true',
@@ -1916,51 +2569,70 @@ def main_extended():
         '--format', choices=['json', 'yaml'], default='json',
         help='Format for printing the schema to console with --pretty (default: json).'
     )
+    parser.add_argument(
+        '--block-assets', action='store_true',
+        help='Block images, fonts and media while loading pages. Much faster, but the color palette '
+             'and image analysis only see CSS-rendered content.'
+    )
+    parser.add_argument(
+        '-v', '--verbose', action='store_true',
+        help='Print progress messages for each extraction step.'
+    )
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format='%(message)s')
+
+    options = {
+        "generate_docs": not args.no_docs,
+        "optimize_ai": not args.no_ai,
+        "generate_code": not args.no_code,
+        "block_assets": args.block_assets,
+        # Only the base schema is printed below, so saved artifacts need not stay in memory
+        "stream_to_disk": bool(args.output)
+    }
 
     # Run the main extraction process
-    results = extract_design_scheme_extended(
-        args.url,
-        args.output,
-        generate_docs=not args.no_docs,
-        optimize_ai=not args.no_ai,
-        generate_code=not args.no_code
-    )
-
-    # Print summary or pretty output if requested
-    if results and results.get("design_schema"):
-        if args.pretty:
-            schema_to_print = results["design_schema"]
-            print("\n--- Extracted Design Schema (Console Output) ---")
-            if args.format == 'json':
-                print(json.dumps(schema_to_print, indent=2, ensure_ascii=False))
-            elif args.format == 'yaml':
-                try:
-                    print(yaml.dump(schema_to_print, allow_unicode=True, sort_keys=False))
-                except NameError:
-                    print("YAML output requires PyYAML. Please install it (`pip install PyYAML`). Falling back to JSON.")
+    if len(args.url) == 1:
+        all_results = {args.url[0]: extract_design_scheme_extended(args.url[0], args.output, **options)}
+    else:
+        all_results = extract_design_schemes_batch(args.url, args.output, workers=args.workers, **options)
+
+    exit_code = 0 # Indicate success
+    for url, results in all_results.items():
+        # Print summary or pretty output if requested
+        if results and results.get("design_schema"):
+            if args.pretty:
+                schema_to_print = results["design_schema"]
+                print("\n--- Extracted Design Schema (Console Output) ---")
+                if args.format == 'json':
                     print(json.dumps(schema_to_print, indent=2, ensure_ascii=False))
-            print("-------------------------------------------------")
+                elif args.format == 'yaml':
+                    try:
+                        import yaml  # Imported only when YAML output is requested
+                        print(yaml.dump(schema_to_print, allow_unicode=True, sort_keys=False))
+                    except ImportError:
+                        print("YAML output requires PyYAML. Please install it (`pip install PyYAML`). Falling back to JSON.")
+                        print(json.dumps(schema_to_print, indent=2, ensure_ascii=False))
+                print("-------------------------------------------------")
+            else:
+                # Print a brief summary if not printing the full schema
+                print("\n--- Extraction Summary ---")
+                summary = results["design_schema"].get("design_summary", {})
+                colors = results["design_schema"].get("colors", {})
+                print(f"URL: {url}")
+                print(f"Style Keywords: {', '.join(summary.get('style_keywords', ['N/A']))}")
+                print(f"Primary Color: {colors.get('primary_color', 'N/A')}")
+                print(f"Secondary Color: {colors.get('secondary_color', 'N/A')}")
+                print(f"Accent Color: {colors.get('accent_color', 'N/A')}")
+                if args.output:
+                    print(f"Full results saved with prefix: {args.output}")
+                print("------------------------")
         else:
-            # Print a brief summary if not printing the full schema
-            print("\n--- Extraction Summary ---")
-            summary = results["design_schema"].get("design_summary", {})
-            colors = results["design_schema"].get("colors", {})
-            print(f"Style Keywords: {', '.join(summary.get('style_keywords', ['N/A']))}")
-            print(f"Primary Color: {colors.get('primary_color', 'N/A')}")
-            print(f"Secondary Color: {colors.get('secondary_color', 'N/A')}")
-            print(f"Accent Color: {colors.get('accent_color', 'N/A')}")
-            if args.output:
-                print(f"Full results saved with prefix: {args.output}")
-            print("------------------------")
-        return 0 # Indicate success
-    else:
-        print("\nExtraction failed or produced no results.")
-        return 1 # Indicate failure
+            print(f"\nExtraction failed or produced no results for: {url}")
+            exit_code = 1 # Indicate failure
+
+    return exit_code
 
 
 if __name__ == "__main__":
-    # Add urllib.parse import needed for logo URL resolution
-    from urllib.parse import urljoin
     sys.exit(main_extended())